@@ -1,3 +1,21 @@
 from litten import utils
 from litten.summary.summary import  LayersSummary
-from litten.visualize.visualize import ModelVisualizer
\ No newline at end of file
+
+
+# heavy modules are only imported when their attribute is first accessed
+_lazy = {
+    "ModelVisualizer": "litten.visualize.visualize",
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        import importlib
+        value = getattr(importlib.import_module(_lazy[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module 'litten' has no attribute '{}'".format(name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Render diagrams and layer summaries for many saved models in parallel
+
+    $ litten-batch models/ -o diagrams/ --workers 8 --show-names
+
+Models saved as litten IR (model.litten.json, see litten.ir) are rendered
+without importing TensorFlow.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+MODEL_EXTENSIONS = (".keras", ".h5", ".hdf5")
+IR_EXTENSIONS    = (".litten.json", ".litten.msgpack")
+
+
+def find_models(paths):
+    """
+    Expand paths into saved model paths
+
+    Files are kept as they are, SavedModel directories (holding a
+    saved_model.pb) are kept whole and other directories are searched one
+    level deep for model files and SavedModel directories.
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path) or _is_saved_model(path):
+            found.append(path)
+        elif os.path.isdir(path):
+            for entry in sorted(os.listdir(path)):
+                entry = os.path.join(path, entry)
+                if (os.path.isfile(entry) and entry.lower().endswith(MODEL_EXTENSIONS + IR_EXTENSIONS)) or _is_saved_model(entry):
+                    found.append(entry)
+        else:
+            raise FileNotFoundError("No such model file or directory: '{}'".format(path))
+    return found
+
+
+def render_models(paths, output_dir, workers=None, format="png", summaries=True, save_ir=False, **visualize_options):
+    """
+    Render every model in a process pool and write a manifest
+
+    Every worker imports TensorFlow (unless every model is litten IR) and
+    loads the label fonts once when it starts, models are then loaded,
+    drawn and summarized in the worker.
+
+    Args:
+        paths: model files or directories, see find_models
+        output_dir: directory for <name>.<format>, <name>.txt and manifest.json
+        workers: number of processes, defaults to the number of CPUs
+        format: diagram format, "svg" selects the SVG backend
+        summaries: also write the layers summary of every model
+        save_ir: also write <name>.litten.json, later renders of it skip TensorFlow
+        visualize_options: passed to ModelVisualizer.visualize_model
+
+    Returns:
+        the manifest, also written to output_dir/manifest.json
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = _unique_names(find_models(paths))
+
+    start   = time.perf_counter()
+    records = []
+    context = multiprocessing.get_context("spawn")
+    tensorflow = not all(_is_ir(path) for path, _ in jobs)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(tensorflow,)) as pool:
+        futures = [pool.submit(_render_model, path, name, output_dir, format, summaries, save_ir, visualize_options) for path, name in jobs]
+        for future in as_completed(futures):
+            records.append(future.result())
+
+    records.sort(key=lambda record: record["name"])
+    manifest = {
+        "output_dir": os.path.abspath(output_dir),
+        "format": format,
+        "options": visualize_options,
+        "total_seconds": round(time.perf_counter() - start, 4),
+        "models": records,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="litten-batch", description="Render diagrams and layer summaries for saved Keras models")
+    parser.add_argument("paths", nargs="+", help="model files, SavedModel directories or directories holding them")
+    parser.add_argument("-o", "--output", default="litten-output", help="output directory")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--format", default="png", help="png, jpeg, webp or svg")
+    parser.add_argument("--palette", default="default")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--show-names", action="store_true")
+    parser.add_argument("--show-connectors", action="store_true")
+    parser.add_argument("--show-properties", action="store_true")
+    parser.add_argument("--no-summaries", action="store_true", help="only render diagrams")
+    parser.add_argument("--save-ir", action="store_true", help="also write the litten IR of every model")
+    args = parser.parse_args(argv)
+
+    manifest = render_models(args.paths, args.output, workers=args.workers, format=args.format, summaries=not args.no_summaries, save_ir=args.save_ir,
+                             palette=args.palette, scale=args.scale, show_names=args.show_names,
+                             show_connectors=args.show_connectors, show_properties=args.show_properties)
+
+    failed = [record for record in manifest["models"] if record["error"]]
+    for record in failed:
+        print("{}: {}".format(record["path"], record["error"]))
+    print("{} models rendered, {} failed in {}s".format(len(manifest["models"]) - len(failed), len(failed), manifest["total_seconds"]))
+    return 1 if failed else 0
+
+
+def _is_saved_model(path):
+    return os.path.isdir(path) and os.path.isfile(os.path.join(path, "saved_model.pb"))
+
+
+def _is_ir(path):
+    return path.lower().endswith(IR_EXTENSIONS)
+
+
+def _unique_names(paths):
+    jobs, seen = [], {}
+    for path in paths:
+        name = os.path.basename(os.path.normpath(path))
+        if _is_ir(name):
+            name = name[:name.lower().rindex(".litten.")]
+        else:
+            name = os.path.splitext(name)[0]
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = "{}_{}".format(name, seen[name])
+        jobs.append((path, name))
+    return jobs
+
+
+def _init_worker(tensorflow=True):
+    # warm state shared by every model rendered in this worker
+    if tensorflow:
+        import tensorflow
+    from litten.layers import fonts
+    fonts.get_font()
+
+
+def _render_model(path, name, output_dir, format, summaries, save_ir, visualize_options):
+    from litten import LayersSummary, ModelVisualizer
+    from litten.ir import ModelIR
+
+    record = {"path": path, "name": name, "diagram": None, "summary": None, "error": None}
+    try:
+        start = time.perf_counter()
+        if _is_ir(path):
+            model = ModelIR.load(path)
+        else:
+            from tensorflow.keras.models import load_model
+            model = ModelIR.extract(load_model(path, compile=False))
+        record["load_seconds"] = round(time.perf_counter() - start, 4)
+
+        if save_ir:
+            model.save(os.path.join(output_dir, "{}.litten.json".format(name)))
+
+        start = time.perf_counter()
+        diagram = os.path.join(output_dir, "{}.{}".format(name, format.lower()))
+        backend = "svg" if format.lower() == "svg" else "pil"
+        ModelVisualizer(model).visualize_model(backend=backend, output=diagram, **visualize_options)
+        record["diagram"] = diagram
+        record["render_seconds"] = round(time.perf_counter() - start, 4)
+
+        if summaries:
+            start = time.perf_counter()
+            summary = os.path.join(output_dir, "{}.txt".format(name))
+            with open(summary, "w", encoding="utf-8") as f:
+                LayersSummary().show_layers_summaries(model, file=f)
+            record["summary"] = summary
+            record["summary_seconds"] = round(time.perf_counter() - start, 4)
+    except Exception as e:
+        record["error"] = "{}: {}".format(e.__class__.__name__, e)
+    return record
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
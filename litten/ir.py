@@ -0,0 +1,286 @@
+"""
+TensorFlow free description of a model
+
+Layers are read once into LayerRecord objects holding what the diagram and
+the summary need, records serialize to JSON or msgpack and can be rendered
+in a process that never imports TensorFlow.
+
+    >>> ModelIR.extract(model).save("model.litten.json")
+    >>> ModelVisualizer(ModelIR.load("model.litten.json")).visualize_model(output="model.png")
+"""
+import json
+import os
+
+from litten import utils
+
+
+IR_VERSION = 1
+
+# layer attributes the drawers use, read when a layer has them
+CONFIG_ATTRIBUTES = ("units", "filters", "kernel_size", "pool_size", "padding", "input_dim", "output_dim", "rate")
+
+input_layers = ["Input", "InputLayer"]
+
+
+class LayerRecord:
+    """
+    One layer, class name, drawing config, shapes and parameter count
+    """
+    __slots__ = ("class_name", "name", "config", "input_shape", "output_shape", "params", "inbound", "is_model", "layers")
+
+    def __init__(self, class_name, name=None, config=None, input_shape=None, output_shape=None, params=None, inbound=(), is_model=False, layers=None) -> None:
+        """
+        Construct LayerRecord class
+
+        Args:
+            class_name: keras class name, "Dense", "Conv2D"...
+            name: keras layer name
+            config: drawing config, see CONFIG_ATTRIBUTES, plus "activation"
+                and "layer" (wrapped class name) when the layer has them
+            input_shape: input shape, the input shape of the model for input layers
+            output_shape: output shape
+            params: number of weights, None when the layer is not built
+            inbound: indices of the records feeding this one in the same list
+            is_model: the layer is a nested model
+            layers: records of a nested model, None when they were not extracted
+        """
+        self.class_name   = class_name
+        self.name         = name
+        self.config       = config or {}
+        self.input_shape  = input_shape
+        self.output_shape = output_shape
+        self.params       = params
+        self.inbound      = list(inbound)
+        self.is_model     = is_model
+        self.layers       = layers
+
+    def __getattr__(self, key):
+        # config entries read like layer attributes, record.units, record.filters...
+        if key in LayerRecord.__slots__:
+            raise AttributeError(key)
+        try:
+            return self.config[key]
+        except KeyError:
+            raise AttributeError("'{}' record has no attribute '{}'".format(self.class_name, key))
+
+    def __repr__(self):
+        return "LayerRecord({!r}, name={!r})".format(self.class_name, self.name)
+
+    def to_dict(self):
+        return {
+            "class_name"  : self.class_name,
+            "name"        : self.name,
+            "config"      : self.config,
+            "input_shape" : self.input_shape,
+            "output_shape": self.output_shape,
+            "params"      : self.params,
+            "inbound"     : self.inbound,
+            "is_model"    : self.is_model,
+            "layers"      : None if self.layers is None else [record.to_dict() for record in self.layers],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        layers = data.get("layers")
+        return cls(data["class_name"], name=data.get("name"), config={key: _tuples(value) for key, value in (data.get("config") or {}).items()},
+                   input_shape=_tuples(data.get("input_shape")), output_shape=_tuples(data.get("output_shape")),
+                   params=data.get("params"), inbound=data.get("inbound", ()), is_model=data.get("is_model", False),
+                   layers=None if layers is None else [cls.from_dict(record) for record in layers])
+
+
+class ModelIR:
+    """
+    Records of every layer of a model, usable in place of the keras model by
+    ModelVisualizer.visualize_model, render_strips and LayersSummary
+    """
+    __slots__ = ("name", "layers")
+
+    def __init__(self, name, layers) -> None:
+        self.name   = name
+        self.layers = layers
+
+    @classmethod
+    def extract(cls, model, depth=None):
+        """
+        Read a keras model
+
+        Args:
+            model: keras model
+            depth: levels of nested models extracted, None for all of them
+        """
+        return cls(getattr(model, "name", None), to_records(model.layers, depth=depth))
+
+    def to_dict(self):
+        return {"version": IR_VERSION, "name": self.name, "layers": [record.to_dict() for record in self.layers]}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version", IR_VERSION) > IR_VERSION:
+            raise ValueError("Model IR version {} is newer than the supported version {}".format(data["version"], IR_VERSION))
+        return cls(data.get("name"), [LayerRecord.from_dict(record) for record in data["layers"]])
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_msgpack(self):
+        import msgpack
+        return msgpack.packb(self.to_dict())
+
+    @classmethod
+    def from_msgpack(cls, data):
+        import msgpack
+        return cls.from_dict(msgpack.unpackb(data))
+
+    def save(self, path):
+        """
+        Write the IR, msgpack for .msgpack paths, JSON otherwise
+        """
+        if os.fspath(path).lower().endswith(".msgpack"):
+            with open(path, "wb") as f:
+                f.write(self.to_msgpack())
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.to_json())
+
+    @classmethod
+    def load(cls, path):
+        if os.fspath(path).lower().endswith(".msgpack"):
+            with open(path, "rb") as f:
+                return cls.from_msgpack(f.read())
+        with open(path, encoding="utf-8") as f:
+            return cls.from_json(f.read())
+
+
+def to_records(layers, depth=None, known=()):
+    """
+    Records of keras layers, records are passed through unchanged
+
+    Args:
+        layers: keras layers or records
+        depth: levels of nested models extracted, None for all of them,
+            the layers of deeper nested models are not read
+        known: records already extracted for the first layers, kept as they are
+
+    Returns:
+        list of LayerRecord
+    """
+    layers = list(layers)
+    if all(isinstance(layer, LayerRecord) for layer in layers):
+        return layers
+
+    index   = {id(layer): i for i, layer in enumerate(layers)}
+    records = list(known)
+    for layer in layers[len(records):]:
+        record = extract_layer(layer, depth=depth)
+        record.inbound = sorted({index[id(parent)] for parent in _parents(layer) if id(parent) in index and parent is not layer})
+        records.append(record)
+    return records
+
+
+def extract_layer(layer, depth=None):
+    """
+    Record of one keras layer, inbound is left empty
+    """
+    class_name = utils.get_layer_name(layer)
+
+    if class_name in input_layers:
+        return LayerRecord(class_name, name=getattr(layer, "name", None), input_shape=_plain(get_input_shape(layer)))
+
+    if utils.is_model(layer):
+        layers = None
+        if depth is None or depth > 0:
+            layers = to_records(layer.layers, depth=None if depth is None else depth - 1)
+        return LayerRecord(class_name, name=getattr(layer, "name", None), input_shape=_shape(layer, "input"),
+                           output_shape=_shape(layer, "output"), params=_params(layer), is_model=True, layers=layers)
+
+    config = _config(layer)
+    if class_name == "Bidirectional":
+        config = dict(_config(layer.layer), layer=utils.get_layer_name(layer.layer))
+
+    return LayerRecord(class_name, name=getattr(layer, "name", None), config=config, input_shape=_shape(layer, "input"),
+                       output_shape=_shape(layer, "output"), params=_params(layer))
+
+
+def get_input_shape(layer):
+    """
+    Shape of an input layer, unwrapped from the single element list keras uses
+    """
+    if isinstance(layer, LayerRecord):
+        return layer.input_shape
+    shape = getattr(layer, "shape", None)
+    if shape is None:
+        shape = getattr(layer, "input_shape", None)
+    if shape is None:
+        shape = getattr(layer, "batch_shape", None)
+    if isinstance(shape, list) and len(shape) == 1:
+        shape = shape[0]
+    return shape
+
+
+def _config(layer):
+    config = {}
+    for key in CONFIG_ATTRIBUTES:
+        if hasattr(layer, key):
+            config[key] = _plain(getattr(layer, key))
+    if hasattr(layer, "activation"):
+        config["activation"] = utils.get_activation_name(layer)
+    return config
+
+
+def _shape(layer, kind):
+    # keras 2 has input_shape/output_shape, keras 3 only the symbolic input/output,
+    # both raise when a layer has several inbound nodes or is not built
+    try:
+        shape = getattr(layer, kind + "_shape", None)
+        if shape is None:
+            tensors = getattr(layer, kind, None)
+            if isinstance(tensors, (list, tuple)):
+                shape = [tensor.shape for tensor in tensors]
+            elif tensors is not None:
+                shape = tensors.shape
+        return _plain(shape)
+    except (AttributeError, RuntimeError, ValueError):
+        return None
+
+
+def _params(layer):
+    try:
+        return int(layer.count_params())
+    except Exception:
+        return None
+
+
+def _parents(layer):
+    # keras 2 nodes know their inbound layers, keras 3 nodes their parent nodes
+    for node in getattr(layer, "_inbound_nodes", None) or []:
+        parents = getattr(node, "inbound_layers", None)
+        if parents is None:
+            parents = [parent.operation for parent in getattr(node, "parent_nodes", [])]
+        if not isinstance(parents, (list, tuple)):
+            parents = [parents]
+        yield from parents
+
+
+def _plain(value):
+    # JSON friendly copy, shapes and sizes stay tuples
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_plain(item) for item in value)
+    if hasattr(value, "as_list"):
+        return _plain(value.as_list())
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _tuples(value):
+    # JSON and msgpack give back lists
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    return value
@@ -1,2 +1,3 @@
 from litten.layers.layers import *
-from litten.layers.connectors import Connector
\ No newline at end of file
+from litten.layers.connectors import Connector
+from litten.layers.fonts import set_font, get_font
\ No newline at end of file
@@ -0,0 +1,208 @@
+import math
+from PIL import ImageColor, ImageDraw
+from litten.layers import fonts
+
+
+def get_draw(image, scale=1.0):
+    """
+    Get a drawer for image, drawers are passed through untouched
+
+    Args:
+        image: PIL image or an already configured drawer
+        scale: pixels per diagram unit, used when image is a PIL image
+    """
+    if isinstance(image, Draw):
+        return image
+    return ScaledDraw(image, scale)
+
+
+class Draw:
+    """
+    Base class for drawing backends
+
+    Layers and connectors keep their geometry in diagram units (a default
+    diagram is 3200 units high) and issue rectangle, rounded_rectangle,
+    ellipse, polygon, line and text calls on a Draw, the backend decides
+    how they end up on the output.
+    """
+    def __init__(self, scale=1.0, origin=(0, 0)) -> None:
+        """
+        Construct Draw class
+
+        Args:
+            scale: pixels per diagram unit
+            origin: diagram point drawn at the top left corner of the output
+        """
+        self.scale  = scale
+        self.origin = origin
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        raise NotImplementedError
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        raise NotImplementedError
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        raise NotImplementedError
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        raise NotImplementedError
+
+    def line(self, xy, fill=None, width=1):
+        raise NotImplementedError
+
+    def text(self, xy, text, fill=None, size=fonts.FONT_SIZE):
+        raise NotImplementedError
+
+    def glyph(self, key, box, paint):
+        """
+        Draw a layer glyph, backends may reuse an earlier rendering of the same key
+
+        Args:
+            key: hashable key, equal keys must give equal glyphs up to translation
+            box: (x0, y0, x1, y1) the glyph covers
+            paint: callable drawing the glyph on a drawer
+        """
+        paint(self)
+
+    def translated(self, dx, dy):
+        """
+        Get a drawer that draws on this one with every coordinate moved by (dx, dy)
+        """
+        if dx == 0 and dy == 0:
+            return self
+        return TranslatedDraw(self, dx, dy)
+
+
+class TranslatedDraw(Draw):
+    """
+    Draw forwarding every call to another drawer with moved coordinates
+    """
+    def __init__(self, target, dx, dy) -> None:
+        super().__init__(target.scale, target.origin)
+        self.target = target
+        self.dx     = dx
+        self.dy     = dy
+
+    def _xy(self, xy):
+        if isinstance(xy[0], (tuple, list)):
+            return [(x + self.dx, y + self.dy) for x, y in xy]
+        return [v + (self.dy if i % 2 else self.dx) for i, v in enumerate(xy)]
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self.target.rectangle(self._xy(xy), fill=fill, outline=outline, width=width)
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        self.target.rounded_rectangle(self._xy(xy), radius=radius, fill=fill, outline=outline, width=width)
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self.target.ellipse(self._xy(xy), fill=fill, outline=outline, width=width)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self.target.polygon(self._xy(xy), fill=fill, outline=outline, width=width)
+
+    def line(self, xy, fill=None, width=1):
+        self.target.line(self._xy(xy), fill=fill, width=width)
+
+    def text(self, xy, text, fill=None, size=fonts.FONT_SIZE):
+        self.target.text(self._xy(xy), text, fill=fill, size=size)
+
+    def glyph(self, key, box, paint):
+        # paint draws in this frame, the target drawer it gets is in the untranslated one
+        self.target.glyph(key, self._xy(box), lambda draw: paint(draw.translated(self.dx, self.dy)))
+
+    def translated(self, dx, dy):
+        return self.target.translated(self.dx + dx, self.dy + dy)
+
+
+class ScaledDraw(Draw):
+    """
+    ImageDraw wrapper that maps diagram units to pixels
+
+    Every coordinate is moved by origin, then coordinates, line widths,
+    radii and font sizes are multiplied by scale before PIL gets them.
+    On a "P" (indexed color) image labels are drawn without anti-aliasing,
+    blending palette indices would give unrelated colors.
+    """
+    def __init__(self, image, scale=1.0, origin=(0, 0), sprites=None, texts=None) -> None:
+        """
+        Construct ScaledDraw class
+
+        Args:
+            image: PIL image to draw on
+            scale: pixels per diagram unit
+            origin: diagram point drawn at the top left pixel of image
+            sprites: SpriteCache used to paste repeated glyphs, None draws every glyph
+            texts: TextCache used to paste repeated labels, None draws every label
+        """
+        super().__init__(scale, origin)
+        self.image   = image
+        self.draw    = ImageDraw.Draw(image)
+        self.sprites = sprites
+        self.texts   = texts
+
+    def _xy(self, xy):
+        ox, oy = self.origin
+        if isinstance(xy[0], (tuple, list)):
+            return [((x - ox) * self.scale, (y - oy) * self.scale) for x, y in xy]
+        return [(v - (oy if i % 2 else ox)) * self.scale for i, v in enumerate(xy)]
+
+    def _width(self, width):
+        return max(1, round(width * self.scale))
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self.draw.rectangle(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        self.draw.rounded_rectangle(self._xy(xy), radius=radius * self.scale, fill=fill, outline=outline, width=self._width(width))
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self.draw.ellipse(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self.draw.polygon(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def line(self, xy, fill=None, width=1):
+        self.draw.line(self._xy(xy), fill=fill, width=self._width(width))
+
+    def text(self, xy, text, fill=None, size=fonts.FONT_SIZE):
+        """
+        Draw text, size is the font size in diagram units
+        """
+        size    = max(1, round(size * self.scale))
+        spacing = self._width(fonts.LINE_SPACING)
+        if self.texts is None:
+            self.draw.text(tuple(self._xy(xy)), text=text, fill=fill, font=fonts.get_font(size), spacing=spacing)
+            return
+
+        # cached masks are rasterized at a whole pixel, labels snap to one
+        mask, (dx, dy) = self.texts.get(str(text), size, spacing, antialias=self.image.mode != "P")
+        x, y = self._xy(xy)
+        self.image.paste(self._ink(fill if fill is not None else "white"), (math.floor(x + 0.5) + dx, math.floor(y + 0.5) + dy), mask)
+
+    def _ink(self, color):
+        # paste takes palette indices on indexed images
+        if self.image.mode != "P":
+            return color
+        return self.image.palette.getcolor(ImageColor.getrgb(color)[:3], self.image)
+
+    def glyph(self, key, box, paint):
+        if self.sprites is None or key is None:
+            paint(self)
+            return
+
+        x0, y0, x1, y1 = box
+        pad  = self.sprites.padding
+        size = (math.ceil((x1 - x0) * self.scale) + 2 * pad + 1,
+                math.ceil((y1 - y0) * self.scale) + 2 * pad + 1)
+
+        def render(sprite):
+            paint(ScaledDraw(sprite, scale=self.scale, origin=(x0 - pad / self.scale, y0 - pad / self.scale), texts=self.texts))
+
+        left = round((x0 - self.origin[0]) * self.scale) - pad
+        top  = round((y0 - self.origin[1]) * self.scale) - pad
+        if self.image.mode == "P":
+            sprite, mask = self.sprites.get_indexed(key + (self.scale,), size, render, self.image)
+        else:
+            sprite = mask = self.sprites.get(key + (self.scale,), size, render)
+        self.image.paste(sprite, (left, top), mask)
@@ -1,15 +1,15 @@
 import math
-from PIL import ImageDraw
+from litten.layers.canvas import get_draw
 
 class Connector:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, scale=1.0) -> None:
+        self.scale = scale
 
     def connect(self, image, layer1, layer2):
-        _from = layer1.get_from()
-        _to   = layer2.get_to()
+        _from = _shift(layer1.get_from(), layer1)
+        _to   = _shift(layer2.get_to(), layer2)
 
-        draw = ImageDraw.Draw(image)
+        draw = get_draw(image, self.scale)
         # [(x, y), (x, y)]
         for p1, p2 in zip(_from, _to):
             draw.line([p1, p2], fill="#000000", width=5)
@@ -17,8 +17,8 @@ class Connector:
         return image
     
     def output(self, image, layer1):
-        _from = layer1.get_from()
-        draw = ImageDraw.Draw(image)
+        _from = _shift(layer1.get_from(), layer1)
+        draw = get_draw(image, self.scale)
 
         points1 = [(_from[0][0]      , _from[0][1] + 350),
                    (_from[0][0] + 200, _from[0][1] + 350),
@@ -32,4 +32,40 @@ class Connector:
                    (_from[1][0] + 200, _from[1][1] - 350),
                    (_from[1][0] + 150, _from[1][1] - 400)]
         draw.line(points1, fill="#000000", width=5)
-        draw.line(points2, fill="#000000", width=5)
\ No newline at end of file
+        draw.line(points2, fill="#000000", width=5)
+
+    def route(self, image, points):
+        """
+        Draw an edge along a routed polyline, ending with an arrow head
+
+        Args:
+            image: The image (or drawer) to draw on
+            points: [(x, y), ...] from the source exit to the target entry
+        """
+        draw = get_draw(image, self.scale)
+        draw.line(points, fill="#000000", width=5)
+
+        x, y = points[-1]
+        draw.line([(x - 60, y - 60), (x, y), (x - 60, y + 60)], fill="#000000", width=5)
+
+        return image
+
+
+def exit_point(layer):
+    """
+    Middle of the right side of a layer, where routed edges leave it
+    """
+    _from = layer.get_from()
+    return (_from[0][0], (_from[0][1] + _from[1][1]) / 2 + layer.start_y)
+
+
+def entry_point(layer):
+    """
+    Middle of the left side of a layer, where routed edges enter it
+    """
+    _to = layer.get_to()
+    return (_to[0][0], (_to[0][1] + _to[1][1]) / 2 + layer.start_y)
+
+
+def _shift(points, layer):
+    return [(x, y + layer.start_y) for x, y in points]
\ No newline at end of file
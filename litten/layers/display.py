@@ -0,0 +1,106 @@
+from litten.layers import fonts
+from litten.layers.canvas import Draw
+
+
+class DisplayList(Draw):
+    """
+    Drawer that records primitives instead of drawing them
+
+    Layers and connectors draw on it like on any other backend, the list is
+    then replayed on a ScaledDraw or an SVGDraw, at any scale and as often
+    as needed, without walking the model again. Every primitive keeps its
+    bounding box so a replay can skip the ones outside a viewport.
+    """
+    def __init__(self) -> None:
+        super().__init__(scale=1.0, origin=(0, 0))
+        self.ops = []
+
+    def _record(self, box, name, *args, **kwargs):
+        op = (box, name, args, kwargs)
+        # drawing the same primitive twice in a row paints nothing new
+        if self.ops and self.ops[-1] == op:
+            return
+        self.ops.append(op)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self._record(_points_box(xy), "rectangle", _copy(xy), fill=fill, outline=outline, width=width)
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        self._record(_points_box(xy), "rounded_rectangle", _copy(xy), radius=radius, fill=fill, outline=outline, width=width)
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self._record(_points_box(xy), "ellipse", _copy(xy), fill=fill, outline=outline, width=width)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self._record(_points_box(xy), "polygon", _copy(xy), fill=fill, outline=outline, width=width)
+
+    def line(self, xy, fill=None, width=1):
+        self._record(_points_box(xy), "line", _copy(xy), fill=fill, width=width)
+
+    def text(self, xy, text, fill=None, size=fonts.FONT_SIZE):
+        x0, y0, x1, y1 = fonts.text_bbox(xy, text, size)
+        # glyph metrics change a little with the rasterized font size
+        pad = size / 2
+        self._record((x0 - pad, y0 - pad, x1 + pad, y1 + pad), "text", _copy(xy), text, fill=fill, size=size)
+
+    def glyph(self, key, box, paint):
+        recorded = DisplayList()
+        paint(recorded)
+        self._record(tuple(box), "glyph", key, tuple(box), recorded)
+
+    def bounds(self):
+        """
+        Box covering every recorded primitive, None when nothing was recorded
+        """
+        if not self.ops:
+            return None
+        boxes = [box for box, _, _, _ in self.ops]
+        return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+                max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+    def replay(self, target, viewport=None):
+        """
+        Draw the recorded primitives on another drawer
+
+        Args:
+            target: Draw backend (ScaledDraw, SVGDraw, another DisplayList...)
+            viewport: (x0, y0, x1, y1) in diagram units, primitives entirely
+                outside it are skipped, None replays everything
+
+        Returns:
+            number of primitives replayed
+        """
+        # a pixel or two of slack for widths and rounding at the target scale
+        slack = 4 / target.scale
+        count = 0
+        for box, name, args, kwargs in self.ops:
+            if viewport is not None:
+                pad = kwargs.get("width", 1) + slack
+                if box[2] + pad < viewport[0] or box[0] - pad > viewport[2] or box[3] + pad < viewport[1] or box[1] - pad > viewport[3]:
+                    continue
+            if name == "glyph":
+                key, glyph_box, recorded = args
+                target.glyph(key, glyph_box, recorded.replay)
+            else:
+                getattr(target, name)(*args, **kwargs)
+            count += 1
+        return count
+
+    def __len__(self):
+        return len(self.ops)
+
+
+def _copy(xy):
+    # callers reuse and mutate their point lists
+    if isinstance(xy[0], (tuple, list)):
+        return tuple(tuple(point) for point in xy)
+    return tuple(xy)
+
+
+def _points_box(xy):
+    if isinstance(xy[0], (tuple, list)):
+        xs = [x for x, _ in xy]
+        ys = [y for _, y in xy]
+    else:
+        xs, ys = xy[0::2], xy[1::2]
+    return (min(xs), min(ys), max(xs), max(ys))
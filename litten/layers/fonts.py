@@ -0,0 +1,97 @@
+import os
+from functools import lru_cache
+from PIL import ImageFont
+
+
+FONT_SIZE    = 100
+LINE_SPACING = 4
+
+_font_path = os.environ.get("LITTEN_FONT")
+_resolved  = None
+
+
+def set_font(path):
+    """
+    Use the TrueType font at path for every label drawn after this call
+
+    Args:
+        path: path to a .ttf/.otf file, None to go back to automatic resolution
+    """
+    global _font_path, _resolved
+    _font_path = path
+    _resolved  = None
+
+
+def get_font_path():
+    """
+    Resolve the font path on first use and remember it
+
+    Resolution order is the path given to set_font (or the LITTEN_FONT
+    environment variable), then DejaVuSans shipped with matplotlib.
+    Returns None when neither is available, get_font then falls back
+    to the font bundled with Pillow.
+    """
+    global _resolved
+    if _resolved is None:
+        _resolved = _font_path or _matplotlib_font() or ""
+    return _resolved or None
+
+
+def get_font(size=FONT_SIZE):
+    """
+    Get a cached font object of the given size
+    """
+    return _load_font(get_font_path(), int(size))
+
+
+def text_bbox(xy, text, size=FONT_SIZE):
+    """
+    Measure the box text would cover when drawn at xy, without drawing it
+
+    Multiline text is measured the way ImageDraw.multiline_text lays it out.
+
+    Returns:
+        (x0, y0, x1, y1) in the same units as xy and size
+    """
+    width, height = _text_extent(get_font_path(), str(text), size)
+    return (xy[0], xy[1], xy[0] + width, xy[1] + height)
+
+
+@lru_cache(maxsize=4096)
+def _text_extent(path, text, size):
+    # labels repeat across layers, every one is measured once per font
+    font  = _load_font(path, int(size))
+    lines = text.split("\n")
+    line_height = font.getbbox("A")[3] + LINE_SPACING
+
+    width, height = 0, 0
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+        left, top, right, bottom = font.getbbox(line)
+        width  = max(width, right)
+        height = max(height, i * line_height + bottom)
+    return (width, height)
+
+
+@lru_cache(maxsize=32)
+def _load_font(path, size):
+    if path is not None:
+        try:
+            return ImageFont.truetype(font=path, size=size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only ships a fixed size bitmap font
+        return ImageFont.load_default()
+
+
+def _matplotlib_font():
+    try:
+        import matplotlib
+    except ImportError:
+        return None
+    path = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans.ttf")
+    return path if os.path.isfile(path) else None
@@ -1,64 +1,187 @@
 import math
-from matplotlib import font_manager
-from PIL import ImageDraw, ImageFont 
-
-
-fonts = font_manager.findSystemFonts(fontpaths=None, fontext='ttf')
-font = ImageFont.truetype(font=fonts[0], size=100)
+from litten.layers import fonts
+from litten.layers.canvas import get_draw
+from litten.layers.connectors import Connector
 
 
 class Layer:
     """
     Layer class contain the base structure for any layer
     """
-    def __init__(self, name: str, start_x: int, palette) -> None:
+    def __init__(self, name: str, start_x: int, palette, scale=1.0) -> None:
         """
         Construct Layer class
 
         Args:
             name: layer name
-            number: layer number
+            start_x: x position where the layer starts (diagram units)
+            palette: color palette
+            scale: pixels per diagram unit
         """
         self.name     = name
         self._start_x = start_x
+        self._start_y = 0
         self._end_x   = 0
         self.palette  = palette
+        self.scale    = scale
+        # (first layer, count) when this layer closes a block drawn once for count repeats
+        self.repeat   = None
+        # position of the keras layer in model.layers, set by the layout
+        self.index    = None
+        # text drawn above the layer, activation statistics for instance
+        self.annotation = None
+
+    def layout(self):
+        """
+        Compute the layer geometry without drawing anything
+
+        Returns:
+            end: x position where the next layer starts
+        """
+        self._end_x = self._start_x + 800
+        return self._end_x
 
-    def draw(self, image, show_name = False, show_properties=False):
+    def place(self, start_x, start_y=0):
         """
-        draw default layer 
+        Move the layer and lay it out again
+
+        Args:
+            start_x: x position where the layer starts
+            start_y: vertical offset of the whole layer, used by graph layouts
+
+        Returns:
+            end: x position where the next layer starts
+        """
+        self._start_x = start_x
+        self._start_y = start_y
+        return self.layout()
+
+    def bounds(self, show_name=False, show_properties=False):
+        """
+        Bounding box of everything draw() would paint, including labels
+
+        Returns:
+            (x0, y0, x1, y1) in diagram units
+        """
+        self.layout()
+        x0, y0, x1, y1 = self._box()
+        labels = self._labels(show_name, show_properties)
+        if self.repeat is not None:
+            bracket, label = self._repeat_marks()
+            x0, y0 = min(x0, bracket[0][0]), min(y0, bracket[1][1])
+            labels = labels + [label]
+        if self.annotation is not None:
+            labels = labels + [self._annotation_label()]
+        for xy, text in labels:
+            tx0, ty0, tx1, ty1 = fonts.text_bbox(xy, text)
+            x0, y0, x1, y1 = min(x0, tx0), min(y0, ty0), max(x1, tx1), max(y1, ty1)
+        return (x0, y0 + self._start_y, x1, y1 + self._start_y)
+
+    def draw(self, image, show_name = False, show_properties=False, show_connectors=False):
+        """
+        Draw the layer and its labels
+
+        Args:
+            image: The image (or drawer) will draw the layer on it
+            show_connectors: only used by layers holding other layers
+
+        Returns:
+            image: The image after drawing the layer
+        """
+        self.layout()
+        draw = self._draw(image)
+        draw.glyph(self._glyph_key(), self._box(), self._draw_glyph)
+
+        if self.repeat is not None:
+            bracket, (xy, text) = self._repeat_marks()
+            draw.line(bracket, fill="#000000", width=5)
+            draw.text(xy, text=text, fill="#000000")
+
+        if self.annotation is not None:
+            xy, text = self._annotation_label()
+            draw.text(xy, text=text, fill="#000000")
+
+        if show_properties:
+            self._show_prop(image)
+        elif show_name:
+            self._show_name(image)
+
+        return image
+
+    def _draw_glyph(self, draw):
+        """
+        draw default layer
         """
-        draw = ImageDraw.Draw(image)
         points = [(self._start_x + 200, 800),
                   (self._start_x + 600, 2000)]
-        
+
         draw.rounded_rectangle(xy  = points, radius=3, fill=self.palette.main_color)
-        
+
         draw.ellipse((points[0][0] + 100, points[0][1] + 150, points[0][0] + 300, points[0][1] + 350 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 500, points[0][0] + 300, points[0][1] + 700 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 850, points[0][0] + 300, points[0][1] + 1050), fill = '#ffffff', outline='#000', width=3)
 
-        # update end_x
-        self._end_x = self._start_x + 800
-
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
+    @property
+    def start(self):
+        return self._start_x
 
     @property
     def end(self):
         return self._end_x
 
+    @property
+    def start_y(self):
+        return self._start_y
+
+    def _draw(self, image):
+        return get_draw(image, self.scale).translated(0, self._start_y)
+
+    def _box(self):
+        return (self._start_x + 200, 800, self._start_x + 600, 2000)
+
+    def _glyph_key(self):
+        # everything the glyph depends on apart from its position
+        return (self.__class__.__name__, self.palette)
+
+    def _repeat_marks(self):
+        # bracket over the whole block, above every glyph, with the repeat count on top
+        first, count = self.repeat
+        x0, x1 = first._box()[0], self._box()[2]
+        top    = min(330, first._box()[1], self._box()[1]) - 80
+        text   = "x{}".format(count)
+        width  = fonts.text_bbox((0, 0), text)[2]
+        return [(x0, top + 80), (x0, top), (x1, top), (x1, top + 80)], (((x0 + x1 - width) / 2, top - 170), text)
+
+    def _annotation_label(self):
+        # above the glyph, and above the repeat bracket when there is one
+        x0, y0, _, _ = self._box()
+        top    = min(330, y0) - 80 - (250 if self.repeat is not None else 0)
+        height = fonts.text_bbox((0, 0), self.annotation)[3]
+        return ((x0, top - height), self.annotation)
+
+    def _labels(self, show_name, show_properties):
+        if show_properties:
+            return self._prop_labels()
+        if show_name:
+            return self._name_labels()
+        return []
+
+    def _name_labels(self):
+        return [((self._start_x + 200, 2100), self.name)]
+
+    def _prop_labels(self):
+        return self._name_labels()
+
     def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = (self._start_x + 200, 2100)
-        draw.text(points, text=self.name, fill="#000000", font=font)
+        self._show_labels(image, self._name_labels())
 
     def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-        points = (self._start_x + 200, 2100)
-        draw.text(points, text=self.name, fill="#000000", font=font)
+        self._show_labels(image, self._prop_labels())
+
+    def _show_labels(self, image, labels):
+        draw = self._draw(image)
+        for points, text in labels:
+            draw.text(points, text=text, fill="#000000")
 
     def get_from(self):
         return [(self._start_x + 600, 800), (self._start_x + 600, 2000)]
@@ -71,80 +194,56 @@ class InputLayer(Layer):
     """
     Input Layer
     """
-    def __init__(self, name, shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.shape = shape
-    
-    def draw(self, image, show_name=False, show_properties = False):
-        """
-        Draw input layer on the image
 
-        Args:
-            image: The image will draw the layer on it
-        
-        Returns:
-            image: The image after drawing the layer
-        """
-        draw = ImageDraw.Draw(image)
+    def layout(self):
+        self._end_x = self._start_x + 600
+        return self._end_x
 
+    def _draw_glyph(self, draw):
+        """
+        Draw input layer
+        """
         for i in range(10):
-            points = [(self._start_x + 200, 400 + i * 200), (self._start_x + 400, 600 + i * 200)] 
+            points = [(self._start_x + 200, 400 + i * 200), (self._start_x + 400, 600 + i * 200)]
             draw.rectangle(points, fill = self.palette.main_color, width = 5, outline= '#000000')
 
-        # update end_x
-        self._end_x = self._start_x + 600
-
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
-
-        return image
+    def _box(self):
+        return (self._start_x + 200, 400, self._start_x + 400, 2400)
 
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = (self._start_x + 150, 2500)
-        draw.text(points, text=self.name, fill="#000000", font=font)
-
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
+    def _name_labels(self):
+        return [((self._start_x + 150, 2500), self.name)]
 
-        points = (self._start_x + 150, 2500)        
-        draw.text(points, text=self.name, fill="#000000", font=font) 
-        
-        points = (self._start_x, 2620)
-        draw.text(points, text="{}".format(self.shape), fill="#000000", font=font) 
+    def _prop_labels(self):
+        return [((self._start_x + 150, 2500), self.name),
+                ((self._start_x      , 2620), "{}".format(self.shape))]
 
     def get_from(self):
         return [(self._start_x + 400, 400), (self._start_x + 400, 2400)]
-        
+
 
 class DenseLayer(Layer):
     """
     Fully Connected Layer (Dense Layer)
     """
-    def __init__(self, name, units, activation, input_shape, output_shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, units, activation, input_shape, output_shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.units = units
         self.activation   = activation
         self.input_shape  = input_shape
         self.output_shape = output_shape
 
-    def draw(self, image, show_name = False, show_properties=False):
+    def _draw_glyph(self, draw):
         """
         Draw a dense layer (FullyConnectedLayer)
-        Args:
-            image: The image will draw the layer on it
-        
-        Returns:
-            image: The image after drawing the layer
         """
-        draw = ImageDraw.Draw(image)
         points = [(self._start_x + 200, 600),
                   (self._start_x + 600, 2200)]
-        
+
         draw.rounded_rectangle(xy  = points, radius=5, fill=self.palette.main_color)
-        
+
         draw.ellipse((points[0][0] + 100, points[0][1] + 150 , points[0][0] + 300, points[0][1] + 350 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 500 , points[0][0] + 300, points[0][1] + 700 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 1200, points[0][0] + 300, points[0][1] + 1400), fill = '#ffffff', outline='#000', width=3)
@@ -154,42 +253,23 @@ class DenseLayer(Layer):
         draw.line   ([(points[0][0] + 200, points[0][1] + 1000), (points[0][0] + 200, points[0][1] + 1010)], fill='#000000', width=20)
         draw.line   ([(points[0][0] + 200, points[0][1] + 1100), (points[0][0] + 200, points[0][1] + 1110)], fill='#000000', width=20)
 
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
+    def _box(self):
+        return (self._start_x + 200, 600, self._start_x + 600, 2200)
 
-        # update end_x
-        self._end_x = self._start_x + 800
+    def _name_labels(self):
+        return [((self._start_x + 230, 2250), self.name)]
 
-        return image
-    
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points1 = (self._start_x + 230, 2250)
-        draw.text(points1, text=self.name, fill="#000000", font=font)
-
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-        points1 = (self._start_x + 230, 2250)
-        draw.text(points1, text=self.name, fill="#000000", font=font)
-        
-        points2 = (self._start_x + 230, 2370)
-        draw.text(points2, text="units: {}".format(self.units), fill="#000000", font=font)
-        
-        points3 = (self._start_x + 230, 2490)
-        draw.text(points3, text=self.activation, fill="#000000", font=font)
-
-        points4 = (self._start_x + 230, 2610)
-        draw.text(points4, text="input shape\n{}".format(self.input_shape), fill="#000000", font=font)        
-        
-        points5 = (self._start_x + 230, 2850)
-        draw.text(points5, text="output shape\n{}".format(self.output_shape), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [((self._start_x + 230, 2250), self.name),
+                ((self._start_x + 230, 2370), "units: {}".format(self.units)),
+                ((self._start_x + 230, 2490), self.activation),
+                ((self._start_x + 230, 2610), "input shape\n{}".format(self.input_shape)),
+                ((self._start_x + 230, 2850), "output shape\n{}".format(self.output_shape))]
 
     def get_from(self):
         return [(self._start_x + 600, 630 ),
                 (self._start_x + 600, 2170)]
-    
+
     def get_to(self):
         return [(self._start_x + 200, 630 ),
                 (self._start_x + 200, 2170)]
@@ -197,10 +277,10 @@ class DenseLayer(Layer):
 
 class ConvLayer(Layer):
     """
-    Convluation Layer 
+    Convluation Layer
     """
-    def __init__(self, name, filters, kernel, activation, input_shape, output_shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, filters, kernel, activation, input_shape, output_shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.filters = filters
         self.kernel  = kernel
         self.activation   = activation
@@ -208,12 +288,20 @@ class ConvLayer(Layer):
         self.output_shape = output_shape
         self._c     = int(min(math.log(filters, 2), 10))
         self._s     = min(int(input_shape[1]/100), 10)
-        self.lpoints= [] 
+        self.lpoints= []
 
-    def draw(self, image, show_name = False, show_properties=False):
-        draw = ImageDraw.Draw(image)
-        points = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
-                  self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
+    def _first_points(self):
+        return [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
+                self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
+
+    def layout(self):
+        # the stack advances 50 units per drawn feature map
+        self.lpoints = [p + 50 * self._c for p in self._first_points()]
+        self._end_x  = self.lpoints[2] + 200
+        return self._end_x
+
+    def _draw_glyph(self, draw):
+        points = self._first_points()
 
         for i in range(self._c):
             if self._c % 2 == 0:
@@ -228,63 +316,42 @@ class ConvLayer(Layer):
                     draw.rectangle(points, fill = self.palette.main_color, outline='#000000')
 
             points[0], points[1], points[2], points[3] = points[0] + 50, points[1] + 50, points[2] + 50, points[3] + 50
-        
-        self.lpoints = points
 
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
-
-        # update end_x
-        self._end_x = points[2] + 200
+    def _box(self):
+        points = self._first_points()
+        return (points[0], points[1], self.lpoints[2] - 50, self.lpoints[3] - 50)
 
-        return image
-
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = [self.lpoints[0], self.lpoints[3]]
-        draw.text(points, text=self.name, fill="#000000", font=font)
+    def _glyph_key(self):
+        return super()._glyph_key() + (self._c, self._s)
 
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
+    def _name_labels(self):
+        return [([self.lpoints[0], self.lpoints[3]], self.name)]
 
-        points = [self.lpoints[0], self.lpoints[3]]
-        draw.text(points, text=self.name, fill="#000000", font=font)
-
-        points = [self.lpoints[0], self.lpoints[3] + 120]
-        draw.text(points, text=self.activation, fill="#000000", font=font)
-
-        points = [self.lpoints[0], self.lpoints[3] + 240]
-        draw.text(points, text="filters:{}".format(self.filters), fill="#000000", font=font)
-
-        points = [self.lpoints[0], self.lpoints[3] + 360]
-        draw.text(points, text="kernel:{}".format(self.kernel), fill="#000000", font=font)
-
-        points = [self.lpoints[0], self.lpoints[3] + 480]
-        draw.text(points, text="input shape:\n{}".format(self.input_shape), fill="#000000", font=font)
-
-        points = [self.lpoints[0], self.lpoints[3] + 720]
-        draw.text(points, text="output shape:\n{}".format(self.output_shape), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [([self.lpoints[0], self.lpoints[3]      ], self.name),
+                ([self.lpoints[0], self.lpoints[3] + 120], self.activation),
+                ([self.lpoints[0], self.lpoints[3] + 240], "filters:{}".format(self.filters)),
+                ([self.lpoints[0], self.lpoints[3] + 360], "kernel:{}".format(self.kernel)),
+                ([self.lpoints[0], self.lpoints[3] + 480], "input shape:\n{}".format(self.input_shape)),
+                ([self.lpoints[0], self.lpoints[3] + 720], "output shape:\n{}".format(self.output_shape))]
 
     def get_from(self):
         point_start = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
                        self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
-        
+
         point_end   = [self._start_x + 300                         + 50 * (self._c - 1), 1100 - 50 * self._c // 2 - 100 * self._s // 2 + 50 * (self._c - 1),
                        self._start_x + 1000 + 100 * self._s        + 50 * (self._c - 1), 1700 - 50 * self._c // 2 + 100 * self._s // 2 + 50 * (self._c - 1)]
 
         return [(point_end[2], point_end[1]),
                 (point_end[2], point_end[3]),
                 (point_start[2], point_start[1])]
-    
+
     def get_to(self):
         point_start = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
                        self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
         point_end   = [self._start_x + 300                      + 50 * (self._c - 1), 1100 - 50 * self._c // 2 - 100 * self._s // 2 + 50 * (self._c - 1),
                        self._start_x + 1000 + 100 * self._s     + 50 * (self._c - 1), 1700 - 50 * self._c // 2 + 100 * self._s // 2 + 50 * (self._c - 1)]
 
-
         return [(point_end[0], point_end[1]),
                 (point_end[0], point_end[3]),
                 (point_start[0], point_start[1])]
@@ -294,21 +361,28 @@ class PoolingLayer(Layer):
     """
     Pooling Layer
     """
-    def __init__(self, name, pool_size, padding, input_shape, output_shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, pool_size, padding, input_shape, output_shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.units = 64
         self.pool_size = pool_size
         self.padding   = padding
         self.input_shape  = input_shape
         self.output_shape = output_shape
         self._c      = int(min(math.log(self.units, 2), 10))
-        self._s      = int(input_shape[1]/100) 
+        self._s      = int(input_shape[1]/100)
         self.lpoints = []
 
-    def draw(self, image, show_name=False, show_properties=False):
-        draw = ImageDraw.Draw(image)
-        points = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
-                  self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
+    def _first_points(self):
+        return [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
+                self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
+
+    def layout(self):
+        self.lpoints = [p + 50 * self._c for p in self._first_points()]
+        self._end_x  = self.lpoints[2] + 200
+        return self._end_x
+
+    def _draw_glyph(self, draw):
+        points = self._first_points()
 
         for i in range(self._c):
             if self._c % 2 == 1:
@@ -323,61 +397,41 @@ class PoolingLayer(Layer):
                     draw.rectangle(points, fill = self.palette.main_color, outline='#000000')
 
             points[0], points[1], points[2], points[3] = points[0] + 50, points[1] + 50, points[2] + 50, points[3] + 50
-        
-        self.lpoints = points
-        
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
-
-        # update end_x
-        self._end_x = points[2] + 200
-
-        return image
-
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = [self.lpoints[0], self.lpoints[3]]
-        draw.text(points, text=self.name, fill="#000000", font=font)
-    
-    def _show_prop(self, image):
-
-        draw = ImageDraw.Draw(image)
-        
-        points = [self.lpoints[0], self.lpoints[3]]
-        draw.text(points, text=self.name, fill="#000000", font=font)
 
-        points = [self.lpoints[0], self.lpoints[3] + 120]
-        draw.text(points, text="padding: {}".format(self.padding), fill="#000000", font=font)
+    def _box(self):
+        points = self._first_points()
+        return (points[0], points[1], self.lpoints[2] - 50, self.lpoints[3] - 50)
 
-        points = [self.lpoints[0], self.lpoints[3] + 240]
-        draw.text(points, text="pool: {}".format(self.pool_size), fill="#000000", font=font)
+    def _glyph_key(self):
+        return super()._glyph_key() + (self._c, self._s)
 
-        points = [self.lpoints[0], self.lpoints[3] + 360]
-        draw.text(points, text="input shape: \n{}".format(self.input_shape), fill="#000000", font=font)
+    def _name_labels(self):
+        return [([self.lpoints[0], self.lpoints[3]], self.name)]
 
-        points = [self.lpoints[0], self.lpoints[3] + 600]
-        draw.text(points, text="output shape \n{}".format(self.output_shape), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [([self.lpoints[0], self.lpoints[3]      ], self.name),
+                ([self.lpoints[0], self.lpoints[3] + 120], "padding: {}".format(self.padding)),
+                ([self.lpoints[0], self.lpoints[3] + 240], "pool: {}".format(self.pool_size)),
+                ([self.lpoints[0], self.lpoints[3] + 360], "input shape: \n{}".format(self.input_shape)),
+                ([self.lpoints[0], self.lpoints[3] + 600], "output shape \n{}".format(self.output_shape))]
 
     def get_from(self):
         point_start = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
                        self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
-        
+
         point_end   = [self._start_x + 300                       + 50 * (self._c - 1), 1100 - 50 * self._c // 2 - 100 * self._s // 2 + 50 * (self._c - 1),
                        self._start_x + 1000 + 100 * self._s      + 50 * (self._c - 1), 1700 - 50 * self._c // 2 + 100 * self._s // 2 + 50 * (self._c - 1)]
 
         return [(point_end[2], point_end[1]),
                 (point_end[2], point_end[3]),
                 (point_start[2], point_start[1])]
-    
+
     def get_to(self):
         point_start = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
                        self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
         point_end   = [self._start_x + 300                        + 50 * (self._c - 1), 1100 - 50 * self._c // 2 - 100 * self._s // 2 + 50 * (self._c - 1),
                        self._start_x + 1000 + 100 * self._s       + 50 * (self._c - 1), 1700 - 50 * self._c // 2 + 100 * self._s // 2 + 50 * (self._c - 1)]
 
-
         return [(point_end[0], point_end[1]),
                 (point_end[0], point_end[3]),
                 (point_start[0], point_start[1])]
@@ -387,19 +441,24 @@ class EmbeddingLayer(Layer):
     """
     Embedding Layer
     """
-    def __init__(self, name, input_dim, output_dim, input_shape, output_shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, input_dim, output_dim, input_shape, output_shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.input_dim    = input_dim
         self.output_dim   = output_dim
         self.input_shape  = input_shape
         self.output_shape = output_shape
         self.lpoints      = []
 
-    def draw(self, image, show_name=False, show_properties=False):
-        draw = ImageDraw.Draw(image)
+    def layout(self):
+        # last cell of the second column
+        self.lpoints = [(self._start_x + 400, 1900), (self._start_x + 600, 2100)]
+        self._end_x  = self._start_x + 800
+        return self._end_x
+
+    def _draw_glyph(self, draw):
 
         for i in range(7):
-            points = [(self._start_x + 200, 700 + i * 200), (self._start_x + 400, 900 + i * 200)] 
+            points = [(self._start_x + 200, 700 + i * 200), (self._start_x + 400, 900 + i * 200)]
             if i % 2:
                 draw.rounded_rectangle(points, radius = 2, fill = self.palette.main_color, width = 5, outline= '#000000')
             else:
@@ -412,43 +471,22 @@ class EmbeddingLayer(Layer):
             else:
                 draw.rounded_rectangle(points, radius = 2, fill = self.palette.main_color, width = 5, outline= '#000000')
 
-        self.lpoints = points
-
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
-
-        # update end_x
-        self._end_x = self._start_x + 800
-        return image
-
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = [self.lpoints[0][0] - 2500, self.lpoints[1][1] + 500]
-        draw.text(points, text=self.name, fill="#000000", font=font)
-    
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-        
-        points = [self.lpoints[0][0] - 270, self.lpoints[1][1] + 50]
-        draw.text(points, text=self.name, fill="#000000", font=font)
+    def _box(self):
+        return (self._start_x + 200, 700, self._start_x + 600, 2100)
 
-        points = [self.lpoints[0][0] - 300, self.lpoints[1][1] + 170]
-        draw.text(points, text="input_dim :{}".format(self.input_dim), fill="#000000", font=font)
+    def _name_labels(self):
+        return [([self.lpoints[0][0] - 270, self.lpoints[1][1] + 50], self.name)]
 
-        points = [self.lpoints[0][0] - 300, self.lpoints[1][1] + 290]
-        draw.text(points, text="output_dim:{}".format(self.output_dim), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [([self.lpoints[0][0] - 270, self.lpoints[1][1] + 50 ], self.name),
+                ([self.lpoints[0][0] - 300, self.lpoints[1][1] + 170], "input_dim :{}".format(self.input_dim)),
+                ([self.lpoints[0][0] - 300, self.lpoints[1][1] + 290], "output_dim:{}".format(self.output_dim)),
+                ([self.lpoints[0][0] - 300, self.lpoints[1][1] + 410], "input_shape:\n{}".format(self.input_shape)),
+                ([self.lpoints[0][0] - 300, self.lpoints[1][1] + 650], "output_shape:\n{}".format(self.output_shape))]
 
-        points = [self.lpoints[0][0] - 300, self.lpoints[1][1] + 410]
-        draw.text(points, text="input_shape:\n{}".format(self.input_shape), fill="#000000", font=font)
-
-        points = [self.lpoints[0][0] - 300, self.lpoints[1][1] + 650]
-        draw.text(points, text="output_shape:\n{}".format(self.output_shape), fill="#000000", font=font)
- 
     def get_from(self):
         return [(self._start_x + 570, 700), (self._start_x + 570, 2100)]
-    
+
     def get_to(self):
         return [(self._start_x + 230, 700), (self._start_x + 230, 2100)]
 
@@ -457,16 +495,20 @@ class RecurrentLayer(Layer):
     """
     Recurrent Layer
     """
-    def __init__(self, name, units, activation, bi, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, units, activation, bi, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.units = units
         self.activation = activation
         self.bi = bi
         self.lpoints = []
 
-    def draw(self, image, show_name=False, show_properties=False):
-        draw = ImageDraw.Draw(image)
-        
+    def layout(self):
+        self.lpoints = [self._start_x + 400, 1200, self._start_x + 1200, 1800]
+        self._end_x  = self._start_x + 1400
+        return self._end_x
+
+    def _draw_glyph(self, draw):
+
         points1 = [ self._start_x + 400, 1200, self._start_x + 1200, 1800]
         points2 = [(self._start_x + 400, 1200), (self._start_x + 300, 1100), (self._start_x + 300, 1700), (self._start_x + 400, 1800)]
         points3 = [(self._start_x + 400, 1200), (self._start_x + 300, 1100), (self._start_x + 1100, 1100), (self._start_x + 1200, 1200)]
@@ -481,38 +523,31 @@ class RecurrentLayer(Layer):
 
         points7 = [(self._start_x + 600 , 1500), (self._start_x + 1000, 1500), (self._start_x + 950, 1450), (self._start_x + 1000, 1500), (self._start_x + 950, 1550)]
 
-        self.lpoints = points1
         if self.bi:
             draw.line(points5, fill="#000000")
             draw.line(points6, fill="#000000")
         else:
             draw.line(points7, fill="#000000")
-        
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
 
-        # update end_x
-        self._end_x = self._start_x + 1400
-        return image
+    def _box(self):
+        return (self._start_x + 300, 1100, self._start_x + 1200, 1800)
 
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        draw.text((self.lpoints[0], self.lpoints[3] + 50) , text=self.name, fill="#000000", font=font)
+    def _glyph_key(self):
+        return super()._glyph_key() + (self.bi,)
 
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
+    def _name_labels(self):
+        return [((self.lpoints[0], self.lpoints[3] + 50), self.name)]
 
-        draw.text((self.lpoints[0], self.lpoints[3] + 50 ), text=self.name, fill="#000000", font=font)
-        draw.text((self.lpoints[0], self.lpoints[3] + 170), text="units: {}".format(self.units), fill="#000000", font=font)
-        draw.text((self.lpoints[0], self.lpoints[3] + 290), text=self.activation, fill="#000000", font=font)
+    def _prop_labels(self):
+        return [((self.lpoints[0], self.lpoints[3] + 50 ), self.name),
+                ((self.lpoints[0], self.lpoints[3] + 170), "units: {}".format(self.units)),
+                ((self.lpoints[0], self.lpoints[3] + 290), self.activation)]
 
     def get_from(self):
         return [(self._start_x + 1200, 1200),
                 (self._start_x + 1200, 1800),
                 (self._start_x + 1100, 1100)]
-    
+
     def get_to(self):
         return [(self._start_x + 400, 1200),
                 (self._start_x + 400, 1800),
@@ -523,8 +558,8 @@ class ConvLSTM(Layer):
     """
     ConvLSTM Layer
     """
-    def __init__(self, name, filters, kernels, activation, shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, filters, kernels, activation, shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.filters    = filters
         self.kernels    = kernels
         self.activation = activation
@@ -533,10 +568,18 @@ class ConvLSTM(Layer):
         self._s    = min(int(shape[0]/100), 10)
         self.lpoints = []
 
-    def draw(self, image, show_name=False, show_properties=False):
-        draw = ImageDraw.Draw(image)
-        points = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
-                  self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
+    def _first_points(self):
+        return [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
+                self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
+
+    def layout(self):
+        # the last drawn feature map
+        self.lpoints = [p + 50 * (self._c - 1) for p in self._first_points()]
+        self._end_x  = self.lpoints[2] + 200
+        return self._end_x
+
+    def _draw_glyph(self, draw):
+        points = self._first_points()
 
         for i in range(self._c):
             if i%2:
@@ -544,9 +587,8 @@ class ConvLSTM(Layer):
             else:
                 draw.rectangle(points, fill = self.palette.secondry, outline='#000000')
             points[0], points[1], points[2], points[3] = points[0] + 50, points[1] + 50, points[2] + 50, points[3] + 50
-        
-        points[0], points[1], points[2], points[3] = points[0] - 50, points[1] - 50, points[2] - 50, points[3] - 50
 
+        points[0], points[1], points[2], points[3] = points[0] - 50, points[1] - 50, points[2] - 50, points[3] - 50
 
         points2 = [(points[0] +      (points[2] - points[0]) // 5,      points[1] + (points[3] - points[1]) // 2),
                    (points[0] + 40 * (points[2] - points[0]) // 5,      points[1] + (points[3] - points[1]) // 2),
@@ -554,41 +596,30 @@ class ConvLSTM(Layer):
                    (points[0] + 40 * (points[2] - points[0]) // 5     , points[1] + (points[3] - points[1]) // 2     ),
                    (points[0] + 40 * (points[2] - points[0]) // 5 - 50, points[1] + (points[3] - points[1]) // 2 + 50)]
 
-        self.lpoints = points
         draw.line(points2, fill="#000000")
-        
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
 
-        # update end_x
-        self._end_x = points[2] + 200
+    def _box(self):
+        points = self._first_points()
+        # the arrow tip can reach past the last feature map
+        arrow_x = self.lpoints[0] + 40 * (self.lpoints[2] - self.lpoints[0]) // 5
+        return (points[0], points[1], max(self.lpoints[2], arrow_x), self.lpoints[3])
 
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = [self.lpoints[0], self.lpoints[3] + 50]
-        draw.text(points, text=self.name, fill="#000000", font=font)
-
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-
-        points = [self.lpoints[0], self.lpoints[3] + 50]
-        draw.text(points, text=self.name, fill="#000000", font=font)
+    def _glyph_key(self):
+        return super()._glyph_key() + (self._c, self._s)
 
-        points = [self.lpoints[0], self.lpoints[3] + 170]
-        draw.text(points, text="filters:{}".format(self.filters), fill="#000000", font=font)
+    def _name_labels(self):
+        return [([self.lpoints[0], self.lpoints[3] + 50], self.name)]
 
-        points = [self.lpoints[0], self.lpoints[3] + 290]
-        draw.text(points, text="kernel :{}".format(self.kernels), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [([self.lpoints[0], self.lpoints[3] + 50 ], self.name),
+                ([self.lpoints[0], self.lpoints[3] + 170], "filters:{}".format(self.filters)),
+                ([self.lpoints[0], self.lpoints[3] + 290], "kernel :{}".format(self.kernels)),
+                ([self.lpoints[0], self.lpoints[3] + 410], "{}".format(self.activation))]
 
-        points = [self.lpoints[0], self.lpoints[3] + 410]
-        draw.text(points, text="{}".format(self.activation), fill="#000000", font=font)
-    
     def get_from(self):
         point_start = [self._start_x + 300                 , 1100 - 50 * self._c // 2 - 100 * self._s // 2,
                        self._start_x + 1000 + 100 * self._s, 1700 - 50 * self._c // 2 + 100 * self._s // 2]
-        
+
         point_end   = [self._start_x + 300                       + 50 * (self._c - 1), 1100 - 50 * self._c // 2 - 100 * self._s // 2 + 50 * (self._c - 1),
                        self._start_x + 1000 + 100 * self._s      + 50 * (self._c - 1), 1700 - 50 * self._c // 2 + 100 * self._s // 2 + 50 * (self._c - 1)]
 
@@ -602,51 +633,43 @@ class ConvLSTM(Layer):
         point_end   = [self._start_x + 300                        + 50 * (self._c - 1), 1100 - 50 * self._c // 2 - 100 * self._s // 2 + 50 * (self._c - 1),
                        self._start_x + 1000 + 100 * self._s       + 50 * (self._c - 1), 1700 - 50 * self._c // 2 + 100 * self._s // 2 + 50 * (self._c - 1)]
 
-
         return [(point_end[0], point_end[1]),
                 (point_end[0], point_end[3]),
                 (point_start[0], point_start[1])]
-    
+
 
 class ActivationLayer(Layer):
     """
     Activation Layer
     """
-    def __init__(self, name, activation, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, activation, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.activation = activation
 
-    def draw(self, image, show_name=False, show_properties=False):
-        draw = ImageDraw.Draw(image)
+    def layout(self):
+        self._end_x = self._start_x + 700
+        return self._end_x
 
-        draw.rectangle((self._start_x + 200, 1600, self._start_x + 600, 1200), fill = self.palette.main_color)
+    def _draw_glyph(self, draw):
+
+        draw.rectangle((self._start_x + 200, 1200, self._start_x + 600, 1600), fill = self.palette.main_color)
         draw.ellipse  ((self._start_x + 250, 1250, self._start_x + 550, 1550), fill = '#ffffff', outline='#000000', width=3)
 
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
+    def _box(self):
+        return (self._start_x + 200, 1200, self._start_x + 600, 1600)
 
-        # update end_x
-        self._end_x = self._start_x + 700
-        return image
-
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = (self._start_x + 250, 1650)
-        draw.text(points, text=self.name, fill="#000000", font=font)
+    def _name_labels(self):
+        return [((self._start_x + 250, 1650), self.name)]
 
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-        points = (self._start_x + 250, 1650)
-        draw.text(points, text=self.name, fill="#000000", font=font)
+    def _prop_labels(self):
+        labels = [((self._start_x + 250, 1650), self.name)]
         if self.activation:
-            points = (self._start_x + 250, 1770)
-            draw.text(points, text=self.activation, fill="#000000", font=font)
+            labels.append(((self._start_x + 250, 1770), self.activation))
+        return labels
 
     def get_from(self):
         return [(self._start_x + 600, 1200), (self._start_x + 600, 1600)]
-    
+
     def get_to(self):
         return [(self._start_x + 200, 1200), (self._start_x + 200, 1600)]
 
@@ -655,14 +678,16 @@ class FlattenLayer(Layer):
     """
     Flatten Layer
     """
-    def __init__(self, name, input_shape, output_shape, start_x, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name, input_shape, output_shape, start_x, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.input_shape = input_shape
         self.output_shape = output_shape
 
-    def draw(self, image, show_name=False, show_properties=False):
+    def layout(self):
+        self._end_x = self._start_x + 1400
+        return self._end_x
 
-        draw = ImageDraw.Draw(image)
+    def _draw_glyph(self, draw):
 
         points1 = [ self._start_x + 100 , 1400 ,  self._start_x + 1100, 1600]
         points2 = [(self._start_x + 100 , 1400), (self._start_x + 200 , 1300), (self._start_x + 1200, 1300), (self._start_x + 1100, 1400)]
@@ -672,38 +697,22 @@ class FlattenLayer(Layer):
         draw.polygon  (points2, fill = self.palette.main_color, width = 3, outline='#000000')
         draw.polygon  (points3, fill = self.palette.main_color, width = 3, outline='#000000')
 
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
-            
-        # update end_x
-        self._end_x = self._start_x + 1400
-        return image
-
-    def _show_name(self, image):
-        draw = ImageDraw.Draw(image)
-        points = [self._start_x + 100, 1650]
-        draw.text(points, text=self.name, fill="#000000", font=font)
-    
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-
-        points = [self._start_x + 200, 1650]
-        draw.text(points, text=self.name, fill="#000000", font=font)
+    def _box(self):
+        return (self._start_x + 100, 1300, self._start_x + 1200, 1600)
 
-        points = [self._start_x + 200, 1770]
-        draw.text(points, text="input shape:\n{}".format(self.input_shape), fill="#000000", font=font)
+    def _name_labels(self):
+        return [([self._start_x + 100, 1650], self.name)]
 
-
-        points = [self._start_x + 200, 2010]
-        draw.text(points, text="output shape:\n{}".format(self.output_shape), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [([self._start_x + 200, 1650], self.name),
+                ([self._start_x + 200, 1770], "input shape:\n{}".format(self.input_shape)),
+                ([self._start_x + 200, 2010], "output shape:\n{}".format(self.output_shape))]
 
     def get_from(self):
         return [(self._start_x + 1100, 1400),
                 (self._start_x + 1100, 1600),
                 (self._start_x + 1200, 1300)]
-    
+
     def get_to(self):
         return [(self._start_x + 100, 1400),
                 (self._start_x + 100, 1600),
@@ -711,18 +720,16 @@ class FlattenLayer(Layer):
 
 
 class DropoutLayer(Layer):
-    def __init__(self, name: str, rate, start_x: int, palette) -> None:
-        super().__init__(name, start_x, palette)
+    def __init__(self, name: str, rate, start_x: int, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
         self.rate = rate
 
-    def draw(self, image, show_name = False, show_properties=False):
-
-        draw = ImageDraw.Draw(image)
+    def _draw_glyph(self, draw):
         points = [(self._start_x + 200, 800),
                   (self._start_x + 600, 2000)]
-        
+
         draw.rounded_rectangle(xy  = points, radius=3, fill=self.palette.drop)
-        
+
         draw.ellipse((points[0][0] + 100, points[0][1] + 150, points[0][0] + 300, points[0][1] + 350 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 500, points[0][0] + 300, points[0][1] + 700 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 850, points[0][0] + 300, points[0][1] + 1050), fill = '#ffffff', outline='#000', width=3)
@@ -730,44 +737,142 @@ class DropoutLayer(Layer):
         draw.line([(points[0][0] + 130, points[0][1] + 180), (points[0][0] + 270, points[0][1] + 320)], fill = '#000000', width=10)
         draw.line([(points[0][0] + 270, points[0][1] + 180), (points[0][0] + 130, points[0][1] + 320)], fill = '#000000', width=10)
 
-
-        # update end_x
-        self._end_x = self._start_x + 800
-
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
-    
-    def _show_prop(self, image):
-        draw = ImageDraw.Draw(image)
-
-        points = (self._start_x + 200, 2100)
-        draw.text(points, text=self.name, fill="#000000", font=font)
-
-        points = (self._start_x + 200, 2220)
-        draw.text(points, text="rate: {}".format(self.rate), fill="#000000", font=font)
+    def _prop_labels(self):
+        return [((self._start_x + 200, 2100), self.name),
+                ((self._start_x + 200, 2220), "rate: {}".format(self.rate))]
 
 class NormalizationLayer(Layer):
-    def __init__(self, name: str, start_x: int, palette) -> None:
-        super().__init__(name, start_x, palette)
-    
-    def draw(self, image, show_name = False, show_properties=False):
+    def __init__(self, name: str, start_x: int, palette, scale=1.0) -> None:
+        super().__init__(name, start_x, palette, scale)
 
-        draw = ImageDraw.Draw(image)
+    def _draw_glyph(self, draw):
         points = [(self._start_x + 200, 800),
                   (self._start_x + 600, 2000)]
-        
+
         draw.rounded_rectangle(xy  = points, radius=3, fill=self.palette.reg)
-        
+
         draw.ellipse((points[0][0] + 100, points[0][1] + 150, points[0][0] + 300, points[0][1] + 350 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 500, points[0][0] + 300, points[0][1] + 700 ), fill = '#ffffff', outline='#000', width=3)
         draw.ellipse((points[0][0] + 100, points[0][1] + 850, points[0][0] + 300, points[0][1] + 1050), fill = '#ffffff', outline='#000', width=3)
 
-        # update end_x
-        self._end_x = self._start_x + 800
 
-        if show_properties:
-            self._show_prop(image)
-        elif show_name:
-            self._show_name(image)
\ No newline at end of file
+class ModelLayer(Layer):
+    """
+    Nested model used as a layer
+
+    Collapsed it is a single box, expanded its own layers are laid out
+    inside a frame titled with the model name.
+    """
+    def __init__(self, name, layers, input_shape, output_shape, start_x, palette, scale=1.0) -> None:
+        """
+        Construct ModelLayer class
+
+        Args:
+            name: model name
+            layers: litten layers of the expanded model, None when collapsed
+            input_shape: model input shape
+            output_shape: model output shape
+        """
+        super().__init__(name, start_x, palette, scale)
+        self.layers       = layers
+        self.input_shape  = input_shape
+        self.output_shape = output_shape
+
+    @property
+    def expanded(self):
+        return bool(self.layers)
+
+    def layout(self):
+        if not self.expanded:
+            self._end_x = self._start_x + 1000
+            return self._end_x
+
+        x = self._start_x + 200
+        for layer in self.layers:
+            x = layer.place(x, self._start_y)
+        self._end_x = x + 200
+        return self._end_x
+
+    def bounds(self, show_name=False, show_properties=False):
+        if not self.expanded:
+            return super().bounds(show_name=show_name, show_properties=show_properties)
+
+        x0, y0, x1, y1 = super().bounds()
+        for layer in self.layers:
+            bx0, by0, bx1, by1 = layer.bounds(show_name=show_name, show_properties=show_properties)
+            x0, y0, x1, y1 = min(x0, bx0), min(y0, by0), max(x1, bx1), max(y1, by1)
+        return (x0, y0, x1, y1)
+
+    def draw(self, image, show_name=False, show_properties=False, show_connectors=False):
+        if not self.expanded:
+            return super().draw(image, show_name=show_name, show_properties=show_properties)
+
+        self.layout()
+        draw = self._draw(image)
+        draw.rounded_rectangle(self._box(), radius=40, outline=self.palette.main_color, width=8)
+        for xy, text in self._title():
+            draw.text(xy, text=text, fill="#000000")
+
+        if self.repeat is not None:
+            bracket, (xy, text) = self._repeat_marks()
+            draw.line(bracket, fill="#000000", width=5)
+            draw.text(xy, text=text, fill="#000000")
+
+        connector  = Connector(scale=self.scale)
+        last_layer = None
+        for layer in self.layers:
+            layer.draw(image, show_name=show_name, show_properties=show_properties, show_connectors=show_connectors)
+            if show_connectors and last_layer is not None:
+                connector.connect(image=image, layer1=last_layer, layer2=layer)
+            last_layer = layer
+
+        return image
+
+    def _draw_glyph(self, draw):
+        """
+        Draw a collapsed model, a card in front of another with a few layer lines
+        """
+        draw.rounded_rectangle([(self._start_x + 260, 740), (self._start_x + 860, 1940)], radius=20, fill=self.palette.secondry,   outline='#000000', width=5)
+        draw.rounded_rectangle([(self._start_x + 200, 800), (self._start_x + 800, 2000)], radius=20, fill=self.palette.main_color, outline='#000000', width=5)
+
+        for y in (1100, 1400, 1700):
+            draw.line([(self._start_x + 320, y), (self._start_x + 680, y)], fill="#000000", width=5)
+
+    def _box(self):
+        if not self.expanded:
+            return (self._start_x + 200, 740, self._start_x + 860, 2000)
+
+        # frame around the nested layers, room on top for the title
+        boxes = [layer._box() for layer in self.layers]
+        top   = min(box[1] for box in boxes)
+        for layer in self.layers:
+            if layer.repeat is not None:
+                top = min(top, layer._repeat_marks()[1][0][1])
+        return (self._start_x + 100, top - 250, self._end_x - 100, max(box[3] for box in boxes) + 100)
+
+    def _labels(self, show_name, show_properties):
+        if self.expanded:
+            return self._title()
+        return super()._labels(show_name, show_properties)
+
+    def _title(self):
+        x0, y0, _, _ = self._box()
+        return [((x0 + 60, y0 + 40), self.name)]
+
+    def _name_labels(self):
+        return [((self._start_x + 200, 2100), self.name)]
+
+    def _prop_labels(self):
+        return [((self._start_x + 200, 2100), self.name),
+                ((self._start_x + 200, 2220), "input shape\n{}".format(self.input_shape)),
+                ((self._start_x + 200, 2460), "output shape\n{}".format(self.output_shape))]
+
+    def get_from(self):
+        if self.expanded:
+            return self.layers[-1].get_from()
+        return [(self._start_x + 800, 800), (self._start_x + 800, 2000)]
+
+    def get_to(self):
+        if self.expanded:
+            return self.layers[0].get_to()
+        return [(self._start_x + 200, 800), (self._start_x + 200, 2000)]
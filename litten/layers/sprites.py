@@ -0,0 +1,194 @@
+from collections import OrderedDict
+
+import PIL.Image as Image
+import PIL.ImageDraw as ImageDraw
+
+from litten.layers import fonts
+
+
+class SpriteCache:
+    """
+    LRU cache of rendered layer glyphs
+
+    A glyph only depends on the layer class, the palette, the scale and a
+    few shape parameters, so it is rendered once into a transparent sprite
+    and pasted for every other layer with the same key. Memory is bounded
+    by the pixel bytes of the sprites, a glyph at scale 1.0 is megabytes.
+    """
+    def __init__(self, maxsize=128, padding=2, max_bytes=64 * 1024 * 1024) -> None:
+        """
+        Construct SpriteCache class
+
+        Args:
+            maxsize: number of sprites kept, least recently used ones are dropped first
+            padding: transparent border in pixels around every sprite, keeps outlines from being clipped
+            max_bytes: pixel bytes kept, sprites bigger than that are rendered but never kept
+        """
+        self.maxsize   = maxsize
+        self.padding   = padding
+        self.max_bytes = max_bytes
+        self.bytes     = 0
+        self.hits      = 0
+        self.misses    = 0
+        self._sprites  = OrderedDict()
+
+    def get(self, key, size, render):
+        """
+        Get the sprite for key, rendering it on a miss
+
+        Args:
+            key: hashable glyph key
+            size: (width, height) of the sprite in pixels
+            render: callable drawing the glyph on the new RGBA sprite
+        """
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = Image.new("RGBA", size, (0, 0, 0, 0))
+        render(sprite)
+        self._store(key, sprite)
+        return sprite
+
+    def get_indexed(self, key, size, render, image):
+        """
+        Get the sprite for key mapped to the palette of a "P" image
+
+        Returns:
+            (sprite, mask): "P" sprite using the palette of image and the
+            "L" mask of its opaque pixels
+        """
+        palette = image.palette.tobytes()
+        entry   = self._sprites.get(key + ("P", palette))
+        if entry is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key + ("P", palette))
+            return entry
+
+        sprite = self.get(key, size, render)
+        target = Image.new("P", (1, 1))
+        target.putpalette(image.getpalette())
+        # glyph colors are in the palette, the nearest color is the exact one
+        indexed = sprite.convert("RGB").quantize(palette=target, dither=Image.Dither.NONE)
+        mask    = sprite.getchannel("A").point(lambda alpha: 255 if alpha else 0)
+
+        entry = (indexed, mask)
+        self._store(key + ("P", palette), entry)
+        return entry
+
+    def _store(self, key, entry):
+        size = _nbytes(entry)
+        if size > self.max_bytes:
+            return
+        self._sprites[key] = entry
+        self.bytes += size
+        while len(self._sprites) > self.maxsize or self.bytes > self.max_bytes:
+            self.bytes -= _nbytes(self._sprites.popitem(last=False)[1])
+
+    def clear(self):
+        self._sprites.clear()
+        self.bytes  = 0
+        self.hits   = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+
+class TextCache:
+    """
+    LRU cache of rasterized labels
+
+    Labels repeat across layers ("relu", "Dropout", "units: 64"...), each
+    one is shaped and rasterized once into a grayscale mask and the mask is
+    pasted with the label color afterwards. Colors are applied at paste time
+    so one mask serves every color.
+    """
+    def __init__(self, maxsize=1024) -> None:
+        """
+        Construct TextCache class
+
+        Args:
+            maxsize: number of masks kept, least recently used ones are dropped first
+        """
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+        self._masks  = OrderedDict()
+
+    def get(self, text, size, spacing=fonts.LINE_SPACING, antialias=True):
+        """
+        Get the mask of text, rasterizing it on a miss
+
+        Args:
+            text: label, may hold several lines
+            size: font size in pixels
+            spacing: pixels between lines
+            antialias: False gives a mask of 0 and 255 only, for indexed images
+
+        Returns:
+            (mask, (dx, dy)): "L" image and its offset from the text anchor
+        """
+        key   = (text, fonts.get_font_path(), size, spacing, antialias)
+        entry = self._masks.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._masks.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        font = fonts.get_font(size)
+        x0, y0, x1, y1 = self.measure(text, size, spacing)
+        mask = Image.new("L", (max(1, x1 - x0), max(1, y1 - y0)), 0)
+        draw = ImageDraw.Draw(mask)
+        if not antialias:
+            draw.fontmode = "1"
+        draw.text((-x0, -y0), text, fill=255, font=font, spacing=spacing)
+
+        entry = (mask, (x0, y0))
+        self._masks[key] = entry
+        while len(self._masks) > self.maxsize:
+            self._masks.popitem(last=False)
+        return entry
+
+    def measure(self, text, size, spacing=fonts.LINE_SPACING):
+        """
+        Pixel box of text drawn at (0, 0), without rasterizing it
+
+        Returns:
+            (x0, y0, x1, y1) in pixels
+        """
+        entry = self._masks.get((text, fonts.get_font_path(), size, spacing, True))
+        if entry is not None:
+            mask, (dx, dy) = entry
+            return (dx, dy, dx + mask.width, dy + mask.height)
+        return _measure(text, fonts.get_font(size), spacing)
+
+    def clear(self):
+        self._masks.clear()
+        self.hits   = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._masks)
+
+
+_measure_draw = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def _nbytes(entry):
+    # pixel bytes of a sprite or of an indexed (sprite, mask) pair
+    images = entry if isinstance(entry, tuple) else (entry,)
+    return sum(image.width * image.height * len(image.getbands()) for image in images)
+
+
+def _measure(text, font, spacing):
+    return tuple(int(v) for v in _measure_draw.multiline_textbbox((0, 0), text, font=font, spacing=spacing))
+
+
+# shared by every raster render in the process
+sprite_cache = SpriteCache()
+text_cache   = TextCache()
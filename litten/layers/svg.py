@@ -0,0 +1,94 @@
+from xml.sax.saxutils import escape, quoteattr
+
+from litten.layers import fonts
+from litten.layers.canvas import Draw
+
+
+class SVGDraw(Draw):
+    """
+    Drawing backend that records SVG elements instead of pixels
+
+    Elements are written in diagram units and the viewBox maps them to
+    the output size, so nothing is rasterized.
+    """
+    def __init__(self, size, scale=1.0, origin=(0, 0), background_color="#FFFFFF") -> None:
+        """
+        Construct SVGDraw class
+
+        Args:
+            size: (width, height) of the drawing in diagram units
+            scale: pixels per diagram unit, sets the width and height attributes
+            origin: diagram point at the top left corner of the drawing
+            background_color: background fill, None for a transparent background
+        """
+        super().__init__(scale, origin)
+        self.size     = size
+        self.elements = []
+        self.font_family = _font_family()
+        if background_color is not None:
+            self.elements.append('<rect x="{}" y="{}" width="{}" height="{}" fill="{}"/>'.format(origin[0], origin[1], size[0], size[1], background_color))
+
+    def _style(self, fill, outline, width):
+        style = ' fill="{}"'.format(fill if fill is not None else "none")
+        if outline is not None:
+            style += ' stroke="{}" stroke-width="{}"'.format(outline, width)
+        return style
+
+    def _points(self, xy):
+        if isinstance(xy[0], (tuple, list)):
+            return [tuple(point) for point in xy]
+        return [(xy[i], xy[i + 1]) for i in range(0, len(xy), 2)]
+
+    def _box(self, xy):
+        (x0, y0), (x1, y1) = self._points(xy)
+        return min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        x, y, w, h = self._box(xy)
+        self.elements.append('<rect x="{}" y="{}" width="{}" height="{}"{}/>'.format(x, y, w, h, self._style(fill, outline, width)))
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        x, y, w, h = self._box(xy)
+        self.elements.append('<rect x="{}" y="{}" width="{}" height="{}" rx="{}"{}/>'.format(x, y, w, h, radius, self._style(fill, outline, width)))
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        x, y, w, h = self._box(xy)
+        self.elements.append('<ellipse cx="{}" cy="{}" rx="{}" ry="{}"{}/>'.format(x + w / 2, y + h / 2, w / 2, h / 2, self._style(fill, outline, width)))
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        points = " ".join("{},{}".format(x, y) for x, y in self._points(xy))
+        self.elements.append('<polygon points="{}"{}/>'.format(points, self._style(fill, outline, width)))
+
+    def line(self, xy, fill=None, width=1):
+        points = " ".join("{},{}".format(x, y) for x, y in self._points(xy))
+        self.elements.append('<polyline points="{}" fill="none" stroke="{}" stroke-width="{}"/>'.format(points, fill, width))
+
+    def text(self, xy, text, fill=None, size=fonts.FONT_SIZE):
+        """
+        Draw text, xy is the top left corner like in PIL
+        """
+        font = fonts.get_font(size)
+        ascent = font.getmetrics()[0]
+        line_height = font.getbbox("A")[3] + fonts.LINE_SPACING
+
+        x, y = xy[0], xy[1]
+        spans = []
+        for i, line in enumerate(str(text).split("\n")):
+            spans.append('<tspan x="{}" y="{}">{}</tspan>'.format(x, y + ascent + i * line_height, escape(line)))
+        self.elements.append('<text font-family={} font-size="{}" fill="{}">{}</text>'.format(quoteattr(self.font_family), size, fill, "".join(spans)))
+
+    def tostring(self):
+        """
+        Get the SVG document
+        """
+        width, height = self.size
+        header = '<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" viewBox="{} {} {} {}">'.format(
+            round(width * self.scale), round(height * self.scale), self.origin[0], self.origin[1], width, height)
+        return "\n".join([header] + self.elements + ["</svg>"])
+
+
+def _font_family():
+    font = fonts.get_font()
+    if not hasattr(font, "getname"):
+        return "sans-serif"
+    return "{}, sans-serif".format(font.getname()[0])
@@ -2,21 +2,43 @@ import os
 import sys
 sys.path.append(os.path.realpath(''))
 from litten import utils 
+from litten.ir import LayerRecord
 
 class LayersSummary:
     def __init__(self) -> None:
         pass
 
-    def show_layers_summaries(self, model):
-        for i, layer in enumerate(model.layers):
-            print("=================================================================================================================")
-            x = "Layer {}: {}".format(i+1, utils.get_layer_name(layer))
+    def show_layers_summaries(self, model, file=None, depth=0):
+        """
+        Print the attributes of every layer
+
+        Nested models are listed as one entry with their layer count unless
+        depth allows expanding them, their layers are numbered 2.1, 2.2...
+
+        Args:
+            model: keras model or litten.ir.ModelIR
+            file: text stream to print to, defaults to sys.stdout
+            depth: levels of nested models expanded
+        """
+        for path, layer, expanded in utils.walk_layers(model.layers, depth=depth):
+            print("=================================================================================================================", file=file)
+            x = "Layer {}: {}".format(".".join(str(i) for i in path), utils.get_layer_name(layer))
             x = x + " " * (24 - len(x)) + "| Attributes"
-            print(x)
-            print("----------------------------------------")
-            attributes = vars(layer)
+            print(x, file=file)
+            print("----------------------------------------", file=file)
+
+            if utils.is_model(layer):
+                print("name" + " " * 19, ": ", getattr(layer, "name", None), file=file)
+                if layer.layers is not None:
+                    print("layers" + " " * 17, ": ", len(layer.layers), "(expanded below)" if expanded else "", file=file)
+                continue
+
+            if isinstance(layer, LayerRecord):
+                attributes = dict(name=layer.name, **layer.config, input_shape=layer.input_shape, output_shape=layer.output_shape, params=layer.params)
+            else:
+                attributes = vars(layer)
 
             for key, value in attributes.items():
                 s = key + " " * (23 - len(key))
                 if key[0] != "_" and key != "kernel" and key != "bias":
-                    print(s, ": ", value)
\ No newline at end of file
+                    print(s, ": ", value, file=file)
\ No newline at end of file
@@ -1,4 +1,3 @@
-from keras.layers import Layer
 from litten.layers import *
 from litten.visualize.palettes import *
 
@@ -27,7 +26,7 @@ def get_width(layers):
     width = 0
     layer_name = get_layer_name(layer=layers[0])
     if layer_name == "Input": 
-        del layers[0]
+        layers = layers[1:]
 
     width += 60
 
@@ -43,9 +42,35 @@ def get_width(layers):
             width += 80
     return width + 60   
 
+def is_model(layer):
+    """
+    True for a keras Model or Sequential, also when it is used as a layer
+
+    Only the class is looked at, reading model.layers is left to the callers
+    that expand the model. Layer records (litten.ir) say it themselves.
+    """
+    from litten.ir import LayerRecord
+    if isinstance(layer, LayerRecord):
+        return layer.is_model
+    return hasattr(type(layer), "layers")
+
+def walk_layers(layers, depth=0, path=()):
+    """
+    Lazily walk layers and the layers of nested models down to depth
+
+    Yields:
+        (path, layer, expanded): index path of the layer starting at 1, the
+        layer, and whether its own layers follow
+    """
+    for i, layer in enumerate(layers):
+        expanded = depth > 0 and is_model(layer) and layer.layers is not None
+        yield path + (i + 1,), layer, expanded
+        if expanded:
+            yield from walk_layers(layer.layers, depth=depth - 1, path=path + (i + 1,))
+
 def get_layer_name(layer):
     try:
-        return layer.__class__.__name__
+        return getattr(layer, "class_name", None) or layer.__class__.__name__
     except:
         return "unknown"
 
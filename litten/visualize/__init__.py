@@ -1,2 +1,18 @@
-from litten.visualize.visualize import *
-from litten import utils
\ No newline at end of file
+# litten.utils imports the palettes of this package, ModelVisualizer and
+# everything it pulls in are only imported when first accessed
+_lazy = {
+    "ModelVisualizer": "litten.visualize.visualize",
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        import importlib
+        value = getattr(importlib.import_module(_lazy[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module 'litten.visualize' has no attribute '{}'".format(name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
@@ -0,0 +1,128 @@
+"""
+Activation dumps on disk
+
+Layer outputs of many inputs are streamed into one preallocated .npy file
+per layer, next to an index.json of names, shapes and dtypes. Files are
+opened memory mapped for reading, datasets bigger than RAM are sliced by
+input, layer or channel without loading them.
+
+    >>> visualizer.dump_activations(images, "activations/")
+    >>> reader = ActivationReader("activations/")
+    >>> reader["conv2d"][100:200, ..., 3]
+"""
+import json
+import os
+import re
+
+INDEX_NAME = "index.json"
+
+
+class ActivationWriter:
+    """
+    Write layer outputs batch by batch into memory mapped .npy files
+    """
+    def __init__(self, directory, count, shapes, dtypes=None) -> None:
+        """
+        Construct ActivationWriter class
+
+        Args:
+            directory: output directory, created when missing
+            count: number of inputs the files are allocated for
+            shapes: {layer name: output shape of one input}, in output order
+            dtypes: {layer name: dtype}, float32 when missing
+        """
+        import numpy as np
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count     = count
+        self.written   = 0
+        self.names     = list(shapes)
+        self.layers    = []
+        self._arrays   = []
+        for i, name in enumerate(self.names):
+            file  = "{:03d}_{}.npy".format(i, re.sub(r"[^\w.-]", "_", name))
+            shape = tuple(int(size) for size in shapes[name])
+            dtype = np.dtype((dtypes or {}).get(name, "float32"))
+            self._arrays.append(np.lib.format.open_memmap(os.path.join(directory, file), mode="w+", dtype=dtype, shape=(count,) + shape))
+            self.layers.append({"name": name, "file": file, "shape": list(shape), "dtype": dtype.str})
+        self._write_index()
+
+    def write(self, outputs):
+        """
+        Append the outputs of one batch
+
+        Args:
+            outputs: one array per layer, in the order of shapes, batch first
+        """
+        size = len(outputs[0])
+        if self.written + size > self.count:
+            raise ValueError("More than the {} inputs the files were allocated for".format(self.count))
+        for array, output in zip(self._arrays, outputs):
+            array[self.written:self.written + size] = output
+        self.written += size
+
+    def close(self):
+        """
+        Flush the files and record how many inputs were written
+        """
+        for array in self._arrays:
+            array.flush()
+        self._arrays = []
+        self._write_index()
+
+    def _write_index(self):
+        with open(os.path.join(self.directory, INDEX_NAME), "w", encoding="utf-8") as f:
+            json.dump({"count": self.written, "allocated": self.count, "layers": self.layers}, f, indent=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ActivationReader:
+    """
+    Zero copy access to a dump written by ActivationWriter
+    """
+    def __init__(self, directory) -> None:
+        """
+        Construct ActivationReader class
+
+        Args:
+            directory: dump directory, holding index.json
+        """
+        import numpy as np
+
+        with open(os.path.join(directory, INDEX_NAME), encoding="utf-8") as f:
+            index = json.load(f)
+        self.directory = directory
+        self.count     = index["count"]
+        self.names     = [layer["name"] for layer in index["layers"]]
+        self.shapes    = {layer["name"]: tuple(layer["shape"]) for layer in index["layers"]}
+        self.dtypes    = {layer["name"]: np.dtype(layer["dtype"]) for layer in index["layers"]}
+        # inputs past count were allocated but never written
+        self._arrays   = {layer["name"]: np.load(os.path.join(directory, layer["file"]), mmap_mode="r")[:self.count]
+                          for layer in index["layers"]}
+
+    def __getitem__(self, name):
+        """
+        Memory mapped outputs of a layer, (count,) + shape
+        """
+        return self._arrays[name]
+
+    def input(self, index):
+        """
+        {layer name: output} of one input
+        """
+        return {name: array[index] for name, array in self._arrays.items()}
+
+    def channel(self, name, channel):
+        """
+        One channel of a layer over every input, channels last
+        """
+        return self._arrays[name][..., channel]
+
+    def __len__(self):
+        return self.count
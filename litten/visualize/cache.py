@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from litten.ir import to_records
+
+
+def model_fingerprint(layers, **options):
+    """
+    Stable hash of an architecture and the options it is rendered with
+
+    Layer names are left out, two models that only differ by layer names
+    draw the same diagram. Nested models keep theirs, it is their title.
+
+    Args:
+        layers: keras layers, usually model.layers, or their records
+        options: render options (palette, show_names, scale, format...)
+
+    Returns:
+        hex digest
+    """
+    records = [_anonymous(record.to_dict()) for record in to_records(layers, depth=options.get("expand_depth"))]
+    payload = json.dumps({"layers": records, "options": options}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _anonymous(record):
+    if not record["is_model"]:
+        record.pop("name")
+    if record["layers"] is not None:
+        record["layers"] = [_anonymous(layer) for layer in record["layers"]]
+    return record
+
+
+class RenderCache:
+    """
+    Content addressed on-disk cache of encoded diagrams
+
+    Entries are files named after their key, reading an entry refreshes its
+    modification time and the least recently used entries are deleted once
+    the directory grows past max_bytes.
+    """
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024) -> None:
+        """
+        Construct RenderCache class
+
+        Args:
+            directory: cache directory, created when missing
+            max_bytes: size bound of the cache directory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """
+        Get the cached bytes for key, None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key, data):
+        """
+        Store data under key and evict old entries when over the size bound
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in max_bytes
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith(".tmp-"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                os.remove(entry.path)
@@ -0,0 +1,104 @@
+import io
+import os
+
+import PIL.Image as Image
+
+# keyword arguments of save_image besides the image, the target and the format
+ENCODER_OPTIONS = ("compress_level", "optimize", "quality", "lossless", "method", "colors")
+
+
+def get_format(fp, format=None):
+    """
+    Pick the image format from format, then from the file extension, PNG otherwise
+
+    format may be a PIL format name or an extension, "jpg" gives "JPEG".
+    """
+    if format is not None:
+        extension = "." + format.lower().lstrip(".")
+        return Image.registered_extensions().get(extension, format.upper())
+    name = fp if isinstance(fp, (str, os.PathLike)) else getattr(fp, "name", None)
+    if isinstance(name, (str, os.PathLike)):
+        extension = os.path.splitext(os.fspath(name))[1].lower()
+        if extension in Image.registered_extensions():
+            return Image.registered_extensions()[extension]
+    return "PNG"
+
+
+def save_image(image, fp, format=None, compress_level=None, optimize=False, quality=None, lossless=False, method=None, colors=None):
+    """
+    Encode image to a path or a file object
+
+    Args:
+        image: PIL image
+        fp: path or binary file object
+        format: PNG, JPEG, WEBP..., guessed from the path when None
+        compress_level: PNG zlib level, 0 (fast, big) to 9 (slow, small)
+        optimize: extra encoder pass for smaller PNG/JPEG files
+        quality: JPEG/WEBP quality (0-100)
+        lossless: lossless WEBP
+        method: WEBP encoder effort, 0 (fast) to 6 (slow, small)
+        colors: quantize to a palette of this many colors before encoding
+    """
+    format  = get_format(fp, format)
+    options = {}
+
+    if colors is not None:
+        if format == "JPEG":
+            raise ValueError("JPEG does not support palette images, drop colors or use PNG/WEBP")
+        if image.mode == "P":
+            image = image.convert("RGB")
+        image = image.quantize(colors=colors)
+    elif image.mode == "P" and format == "JPEG":
+        image = image.convert("RGB")
+
+    if format == "PNG":
+        options["optimize"] = optimize
+        if compress_level is not None:
+            options["compress_level"] = compress_level
+    elif format == "JPEG":
+        options["optimize"] = optimize
+        if quality is not None:
+            options["quality"] = quality
+    elif format == "WEBP":
+        options["lossless"] = lossless
+        if quality is not None:
+            options["quality"] = quality
+        if method is not None:
+            options["method"] = method
+
+    image.save(fp, format=format, **options)
+
+
+def encode_image(image, format="PNG", **options):
+    """
+    Encode image to bytes, options are the ones of save_image
+    """
+    buffer = io.BytesIO()
+    save_image(image, buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def save_text(text, fp):
+    """
+    Write a text document (SVG) to a path or a file object
+    """
+    if isinstance(fp, (str, os.PathLike)):
+        with open(fp, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif isinstance(fp, io.TextIOBase):
+        fp.write(text)
+    else:
+        fp.write(text.encode("utf-8"))
+
+
+def save_bytes(data, fp):
+    """
+    Write already encoded data to a path or a file object
+    """
+    if isinstance(fp, (str, os.PathLike)):
+        with open(fp, "wb") as f:
+            f.write(data)
+    elif isinstance(fp, io.TextIOBase):
+        fp.write(data.decode("utf-8"))
+    else:
+        fp.write(data)
@@ -0,0 +1,348 @@
+"""
+Feature maps of the layers of a keras model
+
+TensorFlow is imported when an extractor is built, importing this module
+stays cheap.
+"""
+import math
+
+
+def select_layers(layers, selection=None):
+    """
+    Pick layers by class or by predicate
+
+    Args:
+        layers: keras layers, usually model.layers
+        selection: None for the convolutions (litten.utils.convs), a class name or
+            a list of class names, a predicate called with every layer, or the
+            layers themselves
+
+    Returns:
+        list of the selected layers, in model order
+    """
+    from litten import utils
+
+    if selection is None:
+        selection = utils.convs
+    if isinstance(selection, str):
+        selection = [selection]
+    if callable(selection):
+        return [layer for layer in layers if selection(layer)]
+
+    selection = list(selection)
+    if all(isinstance(item, str) for item in selection):
+        return [layer for layer in layers if utils.get_layer_name(layer) in selection]
+    return selection
+
+
+def channel_scores(features):
+    """
+    Mean absolute activation of every channel, channels last
+
+    Args:
+        features: (..., channels) outputs, of one input or of a batch
+
+    Returns:
+        (channels,) array
+    """
+    import numpy as np
+
+    features = np.asarray(features)
+    return np.abs(features.reshape(-1, features.shape[-1])).mean(axis=0)
+
+
+def filter_scores(kernel):
+    """
+    L1 norm of every filter of a convolution kernel, output channels last
+    """
+    import numpy as np
+
+    kernel = np.asarray(kernel)
+    return np.abs(kernel.reshape(-1, kernel.shape[-1])).sum(axis=0)
+
+
+def top_channels(scores, k):
+    """
+    Indices of the k highest scores, highest first, all of them when k is None
+    """
+    import numpy as np
+
+    scores = np.asarray(scores)
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    # argpartition finds the k best in linear time, only those are sorted
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+class FeatureExtractor:
+    """
+    Outputs of several layers from one forward pass
+
+    The outputs of the selected layers are gathered in one keras model,
+    built once, whose call is traced by tf.function, so every batch runs
+    a single pass through the network whatever the number of layers.
+    Without layers nothing is built and no input is read.
+    """
+    def __init__(self, model, layers) -> None:
+        """
+        Construct FeatureExtractor class
+
+        Args:
+            model: keras model
+            layers: layers of model whose outputs are extracted, may be empty
+        """
+        self.layers = list(layers)
+        self.names  = [layer.name for layer in self.layers]
+        self._model = self._call = None
+        if not self.layers:
+            return
+
+        import tensorflow as tf
+        from tensorflow.keras.models import Model
+
+        self._model = Model(inputs=model.inputs, outputs=[layer.output for layer in self.layers])
+        self._rank  = len(model.inputs[0].shape)
+        self._call  = tf.function(lambda inputs: self._model(inputs, training=False), reduce_retracing=True)
+
+    def __call__(self, inputs):
+        """
+        Run one batch
+
+        Args:
+            inputs: batch of model inputs, array or tensor
+
+        Returns:
+            list of numpy arrays, the output of every layer, batch first
+        """
+        if not self.layers:
+            return []
+        outputs = self._call(inputs)
+        if not isinstance(outputs, (list, tuple)):
+            outputs = [outputs]
+        return [output.numpy() for output in outputs]
+
+    def batches(self, inputs, batch_size=32):
+        """
+        Run the model over many inputs, one batch at a time
+
+        Args:
+            inputs: array of inputs (first axis), iterable of single inputs, or
+                tf.data.Dataset of inputs or of batches, (x, y) elements are read as x
+            batch_size: inputs per forward pass, batched datasets keep their batches
+
+        Yields:
+            the outputs of every batch, as returned by __call__
+        """
+        if not self.layers:
+            return
+        for batch in _batches(inputs, batch_size, self._rank):
+            yield self(batch)
+
+    def stream(self, inputs, batch_size=32):
+        """
+        Feature maps of many inputs, one input at a time
+
+        Only the outputs of the current batch are alive, whatever the number
+        of inputs.
+
+        Args:
+            inputs, batch_size: as in batches
+
+        Yields:
+            (index, maps): position of the input and {layer name: its feature map}
+        """
+        index = 0
+        for outputs in self.batches(inputs, batch_size):
+            for i in range(len(outputs[0])):
+                yield index, {name: output[i] for name, output in zip(self.names, outputs)}
+                index += 1
+
+    def __len__(self):
+        return len(self.layers)
+
+
+class ChannelStats:
+    """
+    Per channel statistics of a layer output, accumulated batch by batch
+
+    Mean and variance are merged with Welford's parallel update, so memory
+    stays O(channels) whatever the number of inputs and their size.
+    Histograms use bin edges fixed by range, or on the first batch when
+    range is None. Values out of the edges are not binned, they are counted
+    per channel in underflow and overflow.
+    """
+    def __init__(self, bins=32, range=None) -> None:
+        """
+        Construct ChannelStats class
+
+        Args:
+            bins: number of histogram bins
+            range: (low, high) of the histograms, None for the range of the first batch
+        """
+        self.bins      = bins
+        self.range     = range
+        self.count     = 0
+        self.mean      = None
+        self.m2        = None
+        self.min       = None
+        self.max       = None
+        self.zeros     = None
+        self.histogram = None
+        self.bin_edges = None
+        self.underflow = None
+        self.overflow  = None
+
+    def update(self, outputs):
+        """
+        Add a batch of outputs, channels last
+        """
+        import numpy as np
+
+        values = np.asarray(outputs, dtype=np.float64)
+        values = values.reshape(-1, values.shape[-1])
+        count, channels = values.shape
+        if count == 0:
+            return self
+
+        mean = values.mean(axis=0)
+        m2   = ((values - mean) ** 2).sum(axis=0)
+        if self.count == 0:
+            self.mean, self.m2 = mean, m2
+            self.min, self.max = values.min(axis=0), values.max(axis=0)
+            self.zeros         = np.zeros(channels, dtype=np.int64)
+            self.histogram     = np.zeros((channels, self.bins), dtype=np.int64)
+            self.underflow     = np.zeros(channels, dtype=np.int64)
+            self.overflow      = np.zeros(channels, dtype=np.int64)
+            low, high          = self.range if self.range is not None else (self.min.min(), self.max.max())
+            self.bin_edges     = np.linspace(low, high if high > low else low + 1, self.bins + 1)
+        else:
+            total      = self.count + count
+            delta      = mean - self.mean
+            self.mean  = self.mean + delta * count / total
+            self.m2    = self.m2 + m2 + delta ** 2 * self.count * count / total
+            self.min   = np.minimum(self.min, values.min(axis=0))
+            self.max   = np.maximum(self.max, values.max(axis=0))
+        self.count += count
+        self.zeros += (values == 0).sum(axis=0)
+
+        # the last bin includes its right edge, as in np.histogram
+        bins = np.searchsorted(self.bin_edges, values, side="right") - 1
+        bins[values == self.bin_edges[-1]] = self.bins - 1
+        under, over     = bins < 0, bins >= self.bins
+        self.underflow += under.sum(axis=0)
+        self.overflow  += over.sum(axis=0)
+
+        # one bincount over channel * bins + bin fills every channel histogram
+        inside = ~(under | over)
+        self.histogram += np.bincount((bins + np.arange(channels) * self.bins)[inside],
+                                      minlength=channels * self.bins).reshape(channels, self.bins)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+    @property
+    def zero_fraction(self):
+        return self.zeros / self.count
+
+    def dead_channels(self, zero_fraction=0.99):
+        """
+        Channels that are zero for at least zero_fraction of their values, or constant
+        """
+        import numpy as np
+        return np.flatnonzero((self.zero_fraction >= zero_fraction) | (self.max == self.min))
+
+    def summary(self):
+        """
+        Short text for a diagram annotation
+        """
+        return "mean {:.3g} std {:.3g}\nzeros {:.0%} dead {}/{}".format(
+            float(self.mean.mean()), float(self.std.mean()), float(self.zero_fraction.mean()), len(self.dead_channels()), len(self.mean))
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "variance": self.variance, "min": self.min, "max": self.max,
+                "zero_fraction": self.zero_fraction, "histogram": self.histogram, "bin_edges": self.bin_edges,
+                "underflow": self.underflow, "overflow": self.overflow}
+
+
+def mosaic(features, columns=None, downsample=1, padding=1, channels=None):
+    """
+    Tile the channels of one feature map into a single grayscale image
+
+    Every channel is scaled to 0-255 on its own range, then all channels
+    are laid on a grid in one reshape, no per channel loop.
+
+    Args:
+        features: (height, width, channels) map of one input, (width, channels)
+            maps of 1D layers are one row high, 3D maps stack their depth
+        columns: channels per row, None for a square grid
+        downsample: keep one pixel out of downsample in both directions
+        padding: black pixels between tiles
+        channels: indices of the channels tiled, in this order, None for all of them
+
+    Returns:
+        uint8 array (rows * tile height, columns * tile width)
+    """
+    import numpy as np
+
+    maps = np.asarray(features, dtype=np.float32)
+    if channels is not None:
+        maps = maps[..., np.asarray(channels)]
+    if maps.ndim == 2:
+        maps = maps[None]
+    elif maps.ndim > 3:
+        maps = maps.reshape(-1, *maps.shape[-2:])
+    maps = maps[::downsample, ::downsample]
+
+    height, width, channels = maps.shape
+    low    = maps.min(axis=(0, 1))
+    spread = maps.max(axis=(0, 1)) - low
+    maps   = (maps - low) / np.where(spread > 0, spread, 1)
+
+    columns = columns or math.ceil(math.sqrt(channels))
+    rows    = math.ceil(channels / columns)
+    tiles   = np.zeros((rows * columns, height + padding, width + padding), dtype=np.float32)
+    tiles[:channels, :height, :width] = maps.transpose(2, 0, 1)
+
+    grid = tiles.reshape(rows, columns, height + padding, width + padding).transpose(0, 2, 1, 3)
+    grid = grid.reshape(rows * (height + padding), columns * (width + padding))
+    if padding:
+        grid = grid[:-padding, :-padding]
+    return (grid * 255).round().astype(np.uint8)
+
+
+def _batches(inputs, batch_size, rank):
+    import numpy as np
+
+    # tf.data.Dataset, batched unless its elements already are batches
+    if hasattr(inputs, "element_spec"):
+        spec = inputs.element_spec
+        if isinstance(spec, (tuple, list)):
+            inputs, spec = inputs.map(lambda x, *_: x), spec[0]
+        if len(spec.shape) < rank:
+            inputs = inputs.batch(batch_size)
+        yield from inputs
+        return
+
+    # array or tensor holding every input
+    shape = getattr(inputs, "shape", None)
+    if shape is not None and len(shape) == rank:
+        for start in range(0, shape[0], batch_size):
+            yield inputs[start:start + batch_size]
+        return
+
+    # any other iterable of single inputs, or of (x, y) pairs
+    batch = []
+    for item in inputs:
+        batch.append(np.asarray(item[0] if isinstance(item, tuple) else item))
+        if len(batch) == batch_size:
+            yield np.stack(batch)
+            batch = []
+    if batch:
+        yield np.stack(batch)
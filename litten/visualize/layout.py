@@ -0,0 +1,408 @@
+from bisect import bisect_left, bisect_right
+
+from litten import utils
+from litten.ir import input_layers, to_records
+from litten.layers import *
+from litten.layers import fonts
+from litten.layers.connectors import entry_point, exit_point
+from litten.visualize import graph
+from litten.visualize.repeats import find_repeats
+
+
+# blank border around the diagram (diagram units)
+MARGIN = 100
+
+# graph layouts: space between columns and between rows, and the height
+# edges pass through a column at when they skip it
+COLUMN_GAP = 600
+ROW_GAP    = 200
+ROW_CENTER = 1400
+
+
+def build_layer(record, start_x, palette, scale=1.0, expand_depth=0, collapse_repeats=False, min_repeat_length=1):
+    """
+    Map a layer record to the litten layer that draws it
+
+    Args:
+        record: LayerRecord, see litten.ir
+        start_x: x position where the layer starts
+        palette: color palette
+        scale: pixels per diagram unit
+        expand_depth: levels of nested models drawn with their own layers
+        collapse_repeats, min_repeat_length: see layout_layers, for nested models
+
+    Returns:
+        litten layer, not laid out yet
+    """
+    layer_name = record.class_name
+    config     = record.config
+    activation = config.get("activation", "unknown")
+
+    if record.is_model:
+        layers = None
+        if expand_depth > 0 and record.layers is not None:
+            inner  = [inner for inner in record.layers if inner.class_name not in input_layers]
+            layers = _build_chain(inner, 0, palette, scale, expand_depth - 1, collapse_repeats, min_repeat_length)
+        return ModelLayer(name=record.name or layer_name, layers=layers, input_shape=record.input_shape,
+                          output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name == "Flatten":
+        return FlattenLayer(name=layer_name, input_shape=record.input_shape, output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name == "Dense":
+        return DenseLayer(name=layer_name, units=record.units, activation=activation, input_shape=record.input_shape, output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name == "Embedding":
+        return EmbeddingLayer(name=layer_name, input_dim=record.input_dim, output_dim=record.output_dim, input_shape=record.input_shape, output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.activations:
+        if layer_name != "Activation":
+            activation = None
+        return ActivationLayer(name=layer_name, activation=activation, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.convs:
+        return ConvLayer(name=layer_name, filters=record.filters, kernel=record.kernel_size, activation=activation, input_shape=record.input_shape, output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.pools:
+        return PoolingLayer(name=layer_name, pool_size=record.pool_size, padding=record.padding, input_shape=record.input_shape, output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.rnns:
+        bi = False
+        if layer_name == 'Bidirectional':
+            bi = True
+            layer_name = "Bi(" + config.get("layer", "unknown") + ")"
+
+        return RecurrentLayer(name=layer_name, units=record.units, activation=activation, bi=bi, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.convlstms:
+        return ConvLayer(name=layer_name, filters=record.filters, kernel=record.kernel_size, activation=activation, input_shape=record.input_shape, output_shape=record.output_shape, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.dropouts:
+        return DropoutLayer(layer_name, rate=record.rate, start_x=start_x, palette=palette, scale=scale)
+
+    elif layer_name in utils.normalizations:
+        return NormalizationLayer(layer_name, start_x=start_x, palette=palette, scale=scale)
+
+    return Layer(layer_name, start_x=start_x, palette=palette, scale=scale)
+
+
+def layout_layers(layers, palette, scale=1.0, collapse_repeats=False, min_repeat_length=1, expand_depth=0):
+    """
+    First pass: place every layer left to right without drawing
+
+    The caller's list is not modified.
+
+    Args:
+        layers: keras layers, usually model.layers, or their records
+        palette: color palette
+        scale: pixels per diagram unit
+        collapse_repeats: draw blocks of layers repeated back to back once,
+            the last layer of the block carries the repeat count
+        min_repeat_length: shortest block collapsed, in layers
+        expand_depth: levels of nested models drawn with their own layers
+
+    Returns:
+        list of laid out litten layers, starting with the input layer
+    """
+    layers = to_records(layers, depth=expand_depth)
+
+    first = 0
+    if layers[0].class_name in input_layers:
+        shape  = layers[0].input_shape
+        layers = layers[1:]
+        first  = 1
+    else:
+        shape  = layers[0].input_shape
+
+    last_layer = InputLayer(name="Input", shape=shape, start_x=20, palette=palette, scale=scale)
+    last_layer.index = 0 if first else None
+    placed = [last_layer] + _build_chain(layers, last_layer.layout(), palette, scale, expand_depth, collapse_repeats, min_repeat_length, first)
+
+    placed[-1].layout()
+    return placed
+
+
+def _build_chain(layers, start_x, palette, scale, expand_depth, collapse_repeats, min_repeat_length, first_index=0):
+    # litten layers placed left to right from start_x, repeated blocks built once,
+    # first_index is the model.layers position of layers[0]
+    runs = {}
+    if collapse_repeats:
+        runs = {start: (length, count) for start, length, count in find_repeats(layers, min_length=min_repeat_length)}
+
+    placed = []
+    i = 0
+    while i < len(layers):
+        length, count = runs.get(i, (1, 1))
+        block = []
+        for layer in layers[i:i + length]:
+            if placed or block:
+                start_x = (block or placed)[-1].layout()
+            block.append(build_layer(layer, start_x=start_x, palette=palette, scale=scale, expand_depth=expand_depth,
+                                     collapse_repeats=collapse_repeats, min_repeat_length=min_repeat_length))
+            block[-1].index = first_index + i + len(block) - 1
+        if count > 1:
+            block[-1].layout()
+            block[-1].repeat = (block[0], count)
+        placed.extend(block)
+        i += length * count
+    return placed
+
+
+def layout_model(layers, palette, scale=1.0, show_names=False, show_properties=False, mode="auto", collapse_repeats=False, min_repeat_length=1, expand_depth=0):
+    """
+    Lay a model out as a chain or as a graph
+
+    Args:
+        layers: keras layers, usually model.layers, or their records
+        mode: "chain" draws the layers left to right in list order, "dag"
+            follows the inbound node graph, "auto" picks "dag" when the
+            graph has branches or merges
+        collapse_repeats, min_repeat_length: see layout_layers, chains only
+        expand_depth: levels of nested models drawn with their own layers
+
+    Returns:
+        (placed, routes), routes is None for chains, see layout_graph
+    """
+    if mode not in ("auto", "chain", "dag"):
+        raise ValueError("Unknown layout '{}', expected 'auto', 'chain' or 'dag'".format(mode))
+
+    layers = to_records(layers, depth=expand_depth)
+
+    if mode != "chain":
+        edges = model_edges(layers)
+        if mode == "dag" or (edges and not graph.is_chain(len(layers), edges)):
+            return layout_graph(layers, edges, palette, scale=scale, show_names=show_names, show_properties=show_properties, expand_depth=expand_depth)
+
+    return layout_layers(layers, palette, scale=scale, collapse_repeats=collapse_repeats, min_repeat_length=min_repeat_length, expand_depth=expand_depth), None
+
+
+def layout_graph(layers, edges, palette, scale=1.0, show_names=False, show_properties=False, expand_depth=0):
+    """
+    Place layers on columns by graph depth and route the edges between them
+
+    Args:
+        layers: keras layers or their records
+        edges: (i, j) index pairs, layer i feeds layer j
+        expand_depth: levels of nested models drawn with their own layers
+
+    Returns:
+        (placed, routes): litten layers in the order of layers, and a list
+        of (source, target, points) with the polyline of every edge
+    """
+    layers = to_records(layers, depth=expand_depth)
+    placed = []
+    for layer in layers:
+        if layer.class_name in input_layers:
+            placed.append(InputLayer(name="Input", shape=layer.input_shape, start_x=0, palette=palette, scale=scale))
+        else:
+            placed.append(build_layer(layer, start_x=0, palette=palette, scale=scale, expand_depth=expand_depth))
+        placed[-1].index = len(placed) - 1
+
+    result  = graph.layered_layout(len(placed), edges)
+    advance = [layer.layout() - layer.start for layer in placed]
+
+    # row height fits the tallest layer with its labels
+    boxes  = [layer.bounds(show_name=show_names, show_properties=show_properties) for layer in placed]
+    top    = min(box[1] for box in boxes)
+    row_height = max(box[3] for box in boxes) - top + ROW_GAP
+
+    column_width = [0] * len(result.ranks)
+    for i, layer in enumerate(placed):
+        r = result.rank[i]
+        column_width[r] = max(column_width[r], advance[i])
+
+    column_x, x = [], 0
+    for width in column_width:
+        column_x.append(x)
+        x += width + COLUMN_GAP
+
+    def slot_y(node):
+        nodes = result.ranks[result.rank[node]]
+        return (result.position[node] - (len(nodes) - 1) / 2) * row_height
+
+    for i, layer in enumerate(placed):
+        r = result.rank[i]
+        layer.place(column_x[r] + (column_width[r] - advance[i]) / 2, slot_y(i))
+
+    routes = []
+    for (u, v), path in zip(edges, result.paths):
+        points = [exit_point(placed[u])]
+        for node in path[1:]:
+            r     = result.rank[node]
+            gap_x = column_x[r] - COLUMN_GAP / 2
+            if result.is_dummy(node):
+                target = (column_x[r], slot_y(node) + ROW_CENTER)
+            else:
+                target = entry_point(placed[node])
+            bends = [(gap_x, points[-1][1]), (gap_x, target[1]), target]
+            if result.is_dummy(node):
+                bends.append((column_x[r] + column_width[r], target[1]))
+            points += [point for point in bends if point != points[-1]]
+        routes.append((placed[u], placed[v], points))
+
+    return placed, routes
+
+
+def model_edges(layers):
+    """
+    Edges of the layer graph, read from the keras inbound nodes
+
+    Args:
+        layers: keras layers or their records
+
+    Returns:
+        sorted list of (i, j), layer i feeds layer j, both in layers
+    """
+    records = to_records(layers, depth=0)
+    return sorted((i, j) for j, record in enumerate(records) for i in record.inbound)
+
+
+def get_extent(placed, show_names=False, show_properties=False, routes=None):
+    """
+    Box covering every placed layer, its labels, the output arrows and the routed edges
+
+    Returns:
+        (x0, y0, x1, y1) in diagram units, margin included
+    """
+    boxes = [layer.bounds(show_name=show_names, show_properties=show_properties) for layer in placed]
+    for _, _, points in routes or []:
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        boxes.append((min(xs), min(ys), max(xs), max(ys)))
+
+    x0 = min(box[0] for box in boxes)
+    y0 = min(box[1] for box in boxes)
+    x1 = max(max(box[2] for box in boxes), max(layer.end for layer in placed))
+    y1 = max(box[3] for box in boxes)
+    return (x0 - MARGIN, y0 - MARGIN, x1 + MARGIN, y1 + MARGIN)
+
+
+class LayerIndex:
+    """
+    Window queries over placed layers
+
+    Layers are sorted by their start, on a chain the starts are the prefix
+    sums of the layer advances, so the layers in an x range or in a range
+    of model.layers positions are found by bisection and a window costs
+    time proportional to the layers inside it.
+    """
+    def __init__(self, placed, show_names=False, show_properties=False) -> None:
+        """
+        Construct LayerIndex class
+
+        Args:
+            placed: laid out litten layers
+            show_names, show_properties: labels counted in the layer bounds
+        """
+        self.placed = placed
+        # labels rasterized at small scales overhang their measured box, see DisplayList.text
+        pad = fonts.FONT_SIZE / 2
+        self.bounds = [(x0 - pad, y0 - pad, x1 + pad, y1 + pad) for x0, y0, x1, y1 in
+                       (layer.bounds(show_name=show_names, show_properties=show_properties) for layer in placed)]
+        self.order  = sorted(range(len(placed)), key=lambda i: placed[i].start)
+        self.starts = [placed[i].start for i in self.order]
+
+        # how far a layer reaches right and left of its start
+        self.reach_right = max(box[2] - layer.start for box, layer in zip(self.bounds, placed))
+        self.reach_left  = max(layer.start - box[0] for box, layer in zip(self.bounds, placed))
+
+        # model.layers positions, increasing in placed order, and repeated blocks
+        self.positions = []
+        last = -1
+        for layer in placed:
+            last = layer.index if layer.index is not None else last
+            self.positions.append(last)
+        self.blocks = {}
+        for i, layer in enumerate(placed):
+            if layer.repeat is not None:
+                first = next(j for j in range(i, -1, -1) if placed[j] is layer.repeat[0])
+                for j in range(first, i + 1):
+                    self.blocks[j] = (first, i)
+
+    def overlapping(self, x0, x1, neighbours=False):
+        """
+        Indices of the placed layers whose bounds overlap [x0, x1], in placed order
+
+        Args:
+            neighbours: also return the closest layer starting before x0 and
+                the first one starting after x1, connectors to them may cross
+                the range even when both ends are outside
+        """
+        lo = bisect_left(self.starts, x0 - self.reach_right)
+        hi = bisect_right(self.starts, x1 + self.reach_left)
+        found = {i for i in self.order[lo:hi] if self.bounds[i][2] >= x0 and self.bounds[i][0] <= x1}
+        if neighbours:
+            before = bisect_right(self.starts, x0) - 1
+            after  = bisect_left(self.starts, x1)
+            found.update(self.order[i] for i in (before, after) if 0 <= i < len(self.order))
+        return sorted(found)
+
+    def between(self, first, last):
+        """
+        Indices of the placed layers drawing model.layers[first..last], both included
+
+        A collapsed repeated block is taken whole when the range touches it.
+        """
+        lo = max(0, bisect_right(self.positions, first) - 1)
+        hi = max(lo, bisect_right(self.positions, last) - 1)
+        lo = self.blocks.get(lo, (lo, lo))[0]
+        hi = self.blocks.get(hi, (hi, hi))[1]
+        return list(range(lo, hi + 1))
+
+    def extent(self, indices):
+        """
+        Box covering the given placed layers, margin included
+        """
+        boxes = [self.bounds[i] for i in indices]
+        x1 = max(max(box[2] for box in boxes), max(self.placed[i].end for i in indices))
+        return (min(box[0] for box in boxes) - MARGIN, min(box[1] for box in boxes) - MARGIN,
+                x1 + MARGIN, max(box[3] for box in boxes) + MARGIN)
+
+
+
+def annotate(placed, records, annotations):
+    """
+    Set the annotation of the placed layers drawing one named record
+
+    Args:
+        placed: laid out litten layers
+        records: records the layers were built from
+        annotations: {layer name: text}
+    """
+    inside = set()
+    for i, layer in enumerate(placed):
+        if layer.repeat is not None:
+            start = next(j for j in range(i, -1, -1) if placed[j] is layer.repeat[0])
+            inside.update(id(block) for block in placed[start:i + 1])
+
+    last = -1
+    for layer in placed:
+        index = layer.index if layer.index is not None else last
+        if id(layer) not in inside and index == last + 1 and index >= 0:
+            layer.annotation = annotations.get(records[index].name)
+        if layer.repeat is not None:
+            # index is the last layer of the first repetition, the block covers all of them
+            index += (index - layer.repeat[0].index + 1) * (layer.repeat[1] - 1)
+        last = index
+
+
+def placed_signatures(placed, signatures):
+    """
+    Signature of every placed layer, two layers with the same signature draw the same
+
+    Args:
+        placed: laid out litten layers
+        signatures: hashable signature of every record the layers were built from
+
+    Returns:
+        list of tuples, one per placed layer
+    """
+    result = []
+    last   = -1
+    for layer in placed:
+        # a placed layer draws the records after the previous one up to its own
+        index = layer.index if layer.index is not None else last
+        count = layer.repeat[1] if layer.repeat is not None else None
+        result.append((type(layer).__name__, layer.start, layer.end, layer.start_y, count, layer.annotation, tuple(signatures[last + 1:index + 1])))
+        last = index
+    return result
@@ -1,5 +1,7 @@
 import abc
 
+from PIL import ImageColor
+
 class ColorPallete(metaclass=abc.ABCMeta):
 
     @abc.abstractproperty
@@ -64,4 +66,23 @@ class Purples(ColorPallete):
     main_color = "#3e2248"
     secondry   = "#5b3f64"
     reg        = "#775c7f"
-    drop       = "#22052d"
\ No newline at end of file
+    drop       = "#22052d"
+
+
+def indexed_colors(palette, background_color="#FFFFFF"):
+    """
+    Every color a diagram drawn with palette uses, for indexed ("P") canvases
+
+    Args:
+        palette: ColorPallete class
+        background_color: canvas color, always the first entry
+
+    Returns:
+        list of distinct (r, g, b)
+    """
+    colors = []
+    for color in (background_color, "#000000", "#ffffff", palette.main_color, palette.secondry, palette.reg, palette.drop):
+        rgb = ImageColor.getrgb(color)[:3]
+        if rgb not in colors:
+            colors.append(rgb)
+    return colors
@@ -0,0 +1,74 @@
+"""
+Detection of repeated blocks of layers
+
+Backbones are mostly the same few layers repeated, a Conv-BN-ReLU block
+drawn thirty times says less than the same block drawn once with "x30".
+"""
+import json
+
+from litten.ir import to_records
+
+
+# longest block looked for, the scan is linear in the number of layers for every length
+MAX_BLOCK_LENGTH = 16
+
+
+def layer_signature(record):
+    """
+    Class name, config and shapes of a layer record, layer names left out
+
+    The glyph and the properties of a layer depend on its shapes, layers
+    only differing by resolution are not drawn as one. Nested models are
+    compared by name, their records may not hold their layers.
+    """
+    shapes = [record.input_shape, record.output_shape]
+    if record.is_model:
+        return json.dumps([record.class_name, record.name, shapes], default=str)
+    return json.dumps([record.class_name, record.config, shapes], sort_keys=True, default=str)
+
+
+def find_repeats(layers, min_length=1, max_length=MAX_BLOCK_LENGTH):
+    """
+    Find runs of a block of layers repeated back to back
+
+    Every layer is reduced to an integer id of its signature, a block of
+    length L starting at i repeats when ids[j] == ids[j + L] for the L
+    positions after i, so for every L one backward pass counts how far
+    ids keep matching their shift by L. Runs are then picked greedily left
+    to right, the one covering the most layers wins and ties go to the
+    shortest block.
+
+    Args:
+        layers: keras layers or their records
+        min_length: shortest block collapsed, in layers
+        max_length: longest block looked for, in layers
+
+    Returns:
+        list of (start, length, count), count >= 2, sorted by start
+    """
+    ids  = {}
+    keys = [ids.setdefault(layer_signature(record), len(ids)) for record in to_records(layers, depth=0)]
+    n    = len(keys)
+
+    # matches[L][i]: number of consecutive j >= i with keys[j] == keys[j + L]
+    matches = {}
+    for length in range(max(1, min_length), min(max_length, n // 2) + 1):
+        run = [0] * (n + 1)
+        for i in range(n - length - 1, -1, -1):
+            run[i] = run[i + 1] + 1 if keys[i] == keys[i + length] else 0
+        matches[length] = run
+
+    repeats = []
+    i = 0
+    while i < n:
+        best = None
+        for length, run in matches.items():
+            count = run[i] // length + 1
+            if count >= 2 and (best is None or length * count > best[0] * best[1]):
+                best = (length, count)
+        if best is None:
+            i += 1
+            continue
+        repeats.append((i, best[0], best[1]))
+        i += best[0] * best[1]
+    return repeats
@@ -1,157 +1,618 @@
+import io
+import json
 import os
 import sys
 sys.path.append(os.path.realpath(''))
 
-import numpy as np
-import matplotlib.pyplot as plt
 import PIL.Image as Image
 
 from litten import utils
+from litten.ir import to_records
 from litten.layers import *
-from IPython.display import display
-
-from tensorflow.keras.models import Model
+from litten.layers import fonts
+from litten.layers.canvas import ScaledDraw
+from litten.layers.display import DisplayList
+from litten.layers.sprites import sprite_cache, text_cache
+from litten.layers.svg import SVGDraw
+from litten.visualize import export, layout
+from litten.visualize.activations import ActivationReader, ActivationWriter
+from litten.visualize.cache import RenderCache, model_fingerprint
+from litten.visualize.features import ChannelStats, FeatureExtractor, channel_scores, filter_scores, mosaic, select_layers, top_channels
+from litten.visualize.palettes import indexed_colors
 
 
 class ModelVisualizer:
     def __init__(self, model) -> None:
-        self.model            = model
-
+        """
+        Construct ModelVisualizer class
 
-    def visualize_model(self, background_color = "#FFFFFF", palette = 'default', show_connectors=False, show_names=False, show_properties=False):
-        
-        # create connector
-        connector = Connector()
-        
-        # setup image
-        palette   = utils.palettes[palette]
-        width     = utils.get_width(self.model.layers) * 10
-        height    = 3200
-        image     = Image.new("RGB", (width, height), color=background_color)
+        Args:
+            model: keras model, or a litten.ir.ModelIR to draw without TensorFlow
+        """
+        self.model            = model
+        self._records         = {}
+        self._display         = None
+        self._layout          = None
+        self._canvas          = None
+        self._extractors      = {}
+
+    def _layers(self, expand_depth=0):
+        # the keras layers are read once per depth, layers appended to the model
+        # since the last render are the only ones read again
+        return self._extract(expand_depth)[0]
+
+    def _extract(self, expand_depth):
+        """
+        Records of model.layers and their signatures, the records of the
+        unchanged leading layers are kept from the last call
+
+        Returns:
+            (records, signatures)
+        """
+        layers = list(self.model.layers)
+        if expand_depth in self._records:
+            sources, records, signatures = self._records[expand_depth]
+            if len(sources) == len(layers) and all(a is b for a, b in zip(sources, layers)):
+                return records, signatures
+            same = 0
+            while same < min(len(sources), len(layers)) and sources[same] is layers[same]:
+                same += 1
+            records, signatures = records[:same], signatures[:same]
+        else:
+            records, signatures = [], []
+
+        records    = to_records(layers, depth=expand_depth, known=records)
+        signatures = signatures + [_record_signature(record) for record in records[len(signatures):]]
+
+        self._records[expand_depth] = (layers, records, signatures)
+        return records, signatures
+
+
+    def visualize_model(self, background_color = "#FFFFFF", palette = 'default', show_connectors=False, show_names=False, show_properties=False, scale=1.0, height=None, backend="pil", output=None, format=None, cache=None, layout_mode="auto", collapse_repeats=True, min_repeat_length=1, expand_depth=0, layer_range=None, viewport=None, image_mode="RGB", annotations=None, **encoder_options):
+        """
+        Draw the model architecture
+
+        The layers are laid out and drawn once into a display list, the
+        canvas is then allocated to the exact size of the diagram and the
+        list is replayed on it. The list of the last options is kept, so a
+        render at another scale or to another backend does not walk the
+        model again. When layers were appended to the model since the last
+        render, only the new layers are read and drawn, the rest of the
+        diagram is copied from the last canvas.
+
+        Args:
+            scale: pixels per diagram unit, 0.1 gives a preview at 1% of the full size pixels
+            height: target image height in pixels, overrides scale when given
+            backend: "pil" to rasterize the diagram, "svg" to emit SVG without allocating a raster
+            output: where the diagram goes
+                None     -> displayed in the notebook
+                "image"  -> returned, a PIL image (pil) or the SVG document (svg)
+                "bytes"  -> returned encoded
+                path or file object -> written there
+            format: PNG, JPEG, WEBP..., guessed from the output path when None
+            cache: RenderCache or cache directory, unchanged architectures rendered with the
+                same options are then served from the encoded output stored there
+            layout_mode: "chain", "dag" or "auto", see litten.visualize.layout.layout_model
+            collapse_repeats: draw a block of layers repeated back to back once with an "xN" badge
+            min_repeat_length: shortest block collapsed, in layers
+            expand_depth: levels of nested models drawn with their own layers, 0 draws every
+                nested model as one box and never reads its layers
+            layer_range: (first, last) positions or names in model.layers, both included,
+                only these layers and their connectors are drawn, on a canvas fitting them
+            viewport: (left, top, right, bottom) pixels of the full diagram at this scale,
+                only what intersects it is drawn, on a canvas of the viewport size
+            image_mode: "RGB" canvas with anti-aliased labels, or "P" canvas indexed on the
+                palette colors, a third of the memory and faster, smaller PNG files
+            annotations: {layer name: text or ChannelStats} drawn above the layers, layers
+                inside collapsed repeated blocks are not annotated
+            encoder_options: compress_level, optimize, quality, lossless, method, colors,
+                see litten.visualize.export.save_image
+
+        Returns:
+            the image or bytes when output is "image" or "bytes", None otherwise
+        """
+        for name in encoder_options:
+            if name not in export.ENCODER_OPTIONS:
+                raise TypeError("visualize_model() got an unexpected keyword argument '{}'".format(name))
+
+        key = None
+        if cache is not None:
+            if not isinstance(cache, RenderCache):
+                cache = RenderCache(cache)
+            data_format = "SVG" if backend == "svg" else self._data_format(output, format)
+            key  = model_fingerprint(self._layers(expand_depth), background_color=background_color, palette=palette, show_connectors=show_connectors,
+                                     show_names=show_names, show_properties=show_properties, scale=scale, height=height,
+                                     format=data_format, layout_mode=layout_mode, collapse_repeats=collapse_repeats,
+                                     min_repeat_length=min_repeat_length, expand_depth=expand_depth, layer_range=self._range_positions(layer_range),
+                                     viewport=viewport, image_mode=image_mode, annotations=self._annotation_positions(annotations),
+                                     font=fonts.get_font_path(), **encoder_options)
+            data = cache.get(key)
+            if data is not None:
+                return self._output_data(data, backend, output)
+
+        options = (palette, show_connectors, show_names, show_properties, layout_mode, collapse_repeats, min_repeat_length, expand_depth,
+                   _annotations(annotations))
+        if layer_range is None and viewport is None:
+            display, (x0, y0, x1, y1) = self._display_list(*options)
+            if height is not None:
+                scale = height / (y1 - y0)
+        else:
+            display, (x0, y0, x1, y1), scale = self._window(options, layer_range, viewport, scale, height)
+
+        # replay the recorded diagram on the backend
+        if backend == "svg":
+            draw = SVGDraw((x1 - x0, y1 - y0), scale=scale, origin=(x0, y0), background_color=background_color)
+            display.replay(draw, viewport=(x0, y0, x1, y1))
+        elif backend == "pil":
+            image = self._raster(display, (x0, y0, x1, y1), scale, (background_color, palette, image_mode), keep=layer_range is None and viewport is None)
+            if self._canvas is not None and image is self._canvas[-1] and isinstance(output, str) and output == "image":
+                # the kept canvas is the base of the next render
+                image = image.copy()
+        else:
+            raise ValueError("Unknown backend '{}', expected 'pil' or 'svg'".format(backend))
 
-        # start visualizing
+        if key is not None:
+            if backend == "svg":
+                data = draw.tostring().encode("utf-8")
+            else:
+                data = export.encode_image(image, format=data_format, **encoder_options)
+            cache.put(key, data)
+            if not (isinstance(output, str) and output == "image"):
+                return self._output_data(data, backend, output)
+
+        if backend == "svg":
+            return self._output_svg(draw.tostring(), output)
+        return self._output_image(image, output, format, encoder_options)
+
+    def _data_format(self, output, format):
+        if output is None or isinstance(output, str) and output in ("image", "bytes"):
+            return export.get_format(None, format)
+        return export.get_format(output, format)
+
+    def _output_data(self, data, backend, output):
+        """
+        Deliver already encoded output (from the render cache)
+        """
+        if isinstance(output, str) and output == "bytes":
+            return data
+        if output is not None and not (isinstance(output, str) and output == "image"):
+            export.save_bytes(data, output)
+            return
+        if backend == "svg":
+            return self._output_svg(data.decode("utf-8"), output)
+        return self._output_image(Image.open(io.BytesIO(data)), output, None, {})
+
+    def _output_image(self, image, output, format, encoder_options):
+        if output is None:
+            from IPython.display import display
+            display(image)
+        elif isinstance(output, str) and output == "image":
+            return image
+        elif isinstance(output, str) and output == "bytes":
+            return export.encode_image(image, format=format or "PNG", **encoder_options)
+        else:
+            export.save_image(image, output, format=format, **encoder_options)
+
+    def _output_svg(self, document, output):
+        if output is None:
+            from IPython.display import SVG, display
+            display(SVG(document))
+        elif isinstance(output, str) and output == "image":
+            return document
+        elif isinstance(output, str) and output == "bytes":
+            return document.encode("utf-8")
+        else:
+            export.save_text(document, output)
+
+    def render_strips(self, strip_width=2048, background_color = "#FFFFFF", palette = 'default', show_connectors=False, show_names=False, show_properties=False, scale=1.0, height=None, layout_mode="auto", collapse_repeats=True, min_repeat_length=1, expand_depth=0, image_mode="RGB", annotations=None):
+        """
+        Render the diagram as a sequence of vertical strips
+
+        The diagram is recorded once and every strip only replays the
+        primitives overlapping it, so peak memory is bounded by
+        strip_width x height whatever the depth of the model.
+
+        Args:
+            strip_width: width of every strip in pixels, the last one may be narrower
+            other arguments: as in visualize_model
+
+        Yields:
+            (left, image): pixel offset of the strip in the full diagram and the strip image
+        """
+        display, (x0, y0, x1, y1) = self._display_list(palette, show_connectors, show_names, show_properties, layout_mode,
+                                                       collapse_repeats, min_repeat_length, expand_depth, _annotations(annotations))
+
+        if height is not None:
+            scale = height / (y1 - y0)
+
+        width  = max(1, round((x1 - x0) * scale))
+        height = max(1, round((y1 - y0) * scale))
+        canvas = (background_color, palette, image_mode)
+
+        for left in range(0, width, strip_width):
+            image  = _new_image((min(strip_width, width - left), height), *canvas)
+            origin = (x0 + left / scale, y0)
+            draw   = ScaledDraw(image, scale=scale, origin=origin, sprites=sprite_cache, texts=text_cache)
+
+            display.replay(draw, viewport=(origin[0], y0, origin[0] + image.width / scale, y1))
+            yield left, image
+
+    def save_strips(self, directory, prefix="strip", format="PNG", **kwargs):
+        """
+        Render the diagram strip by strip and write every strip as soon as it is drawn
+
+        Args:
+            directory: output directory, created when missing
+            prefix: file name prefix, files are named <prefix>_<index>.<format>
+            format: PIL image format
+            kwargs: passed to render_strips
+
+        Returns:
+            list of written paths, left to right
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for i, (left, image) in enumerate(self.render_strips(**kwargs)):
+            path = os.path.join(directory, "{}_{:04d}.{}".format(prefix, i, format.lower()))
+            image.save(path, format=format)
+            paths.append(path)
+        return paths
+
+    def _placement(self, palette, show_names, show_properties, layout_mode, collapse_repeats, min_repeat_length, expand_depth, annotations=()):
+        """
+        Lay the diagram out, the last layout is reused for the same options
+
+        Returns:
+            (placed, routes, extent)
+        """
+        key     = (palette, show_names, show_properties, layout_mode, collapse_repeats, min_repeat_length, expand_depth, annotations)
+        records = self._layers(expand_depth)
+        if self._layout is not None and self._layout[0] == key and self._layout[1] is records:
+            return self._layout[2]
+
+        placed, routes = layout.layout_model(records, palette=utils.palettes[palette], show_names=show_names, show_properties=show_properties,
+                                             mode=layout_mode, collapse_repeats=collapse_repeats, min_repeat_length=min_repeat_length, expand_depth=expand_depth)
+        if annotations:
+            layout.annotate(placed, records, dict(annotations))
+        extent = layout.get_extent(placed, show_names=show_names, show_properties=show_properties, routes=routes)
+
+        self._layout = (key, records, (placed, routes, extent), None)
+        return self._layout[2]
+
+    def _layer_index(self, show_names, show_properties):
+        # built on the first window query of the current layout
+        if self._layout[3] is None:
+            placed = self._layout[2][0]
+            self._layout = self._layout[:3] + (layout.LayerIndex(placed, show_names=show_names, show_properties=show_properties),)
+        return self._layout[3]
+
+    def _display_list(self, palette, show_connectors, show_names, show_properties, layout_mode, collapse_repeats, min_repeat_length, expand_depth, annotations=()):
+        """
+        Lay out and record the diagram, the last recording is reused for the same options
+
+        Returns:
+            (display, extent): DisplayList of the diagram and its (x0, y0, x1, y1)
+        """
+        key = (palette, show_connectors, show_names, show_properties, layout_mode, collapse_repeats, min_repeat_length, expand_depth, annotations)
+        placed, routes, extent = self._placement(palette, show_names, show_properties, layout_mode, collapse_repeats, min_repeat_length, expand_depth, annotations)
+        if self._display is not None and self._display[0] == key and self._display[3] is placed:
+            return self._display[1:3]
+
+        signatures = layout.placed_signatures(placed, self._extract(expand_depth)[1])
+        display    = DisplayList()
+        marks      = []
+        first      = 0
+        if self._display is not None and self._display[0] == key and routes is None and self._display[5] is None:
+            # a chain is laid out left to right, the layers before the first
+            # changed one are where they were and their primitives are kept
+            _, previous, _, _, old_signatures, _, old_marks = self._display
+            while first < min(len(signatures), len(old_signatures)) - 1 and signatures[first] == old_signatures[first]:
+                first += 1
+            display.ops = previous.ops[:old_marks[first]]
+            marks       = old_marks[:first]
+
+        window = None if first == 0 else list(range(first, len(placed)))
+        self._draw_layers(display, placed, show_connectors=show_connectors, show_names=show_names, show_properties=show_properties, routes=routes,
+                          window=window, marks=marks)
+
+        self._display = (key, display, extent, placed, signatures, routes, marks)
+        return display, extent
+
+    def _raster(self, display, extent, scale, canvas, keep=False):
+        """
+        Rasterize a display list
+
+        The last full canvas is kept with the display list it was drawn
+        from. When the next list only differs after some primitive, the
+        canvas columns left of everything that changed are copied and only
+        the primitives reaching the columns on their right are replayed.
+
+        Args:
+            canvas: (background_color, palette, image_mode)
+            keep: the diagram is the full one, reuse and keep the canvas
+
+        Returns:
+            PIL image
+        """
+        x0, y0, x1, y1 = extent
+        width  = max(1, round((x1 - x0) * scale))
+        height = max(1, round((y1 - y0) * scale))
+        image  = _new_image((width, height), *canvas)
+        draw   = ScaledDraw(image, scale=scale, origin=(x0, y0), sprites=sprite_cache, texts=text_cache)
+
+        previous = None
+        if keep and self._canvas is not None:
+            old_scale, old_canvas, old_display, (ox0, oy0, _, oy1), old_image = self._canvas
+            if (old_scale, old_canvas, ox0, oy0, oy1) == (scale, canvas, x0, y0, y1) and old_image.height == height:
+                previous = (old_display, old_image)
+
+        if previous is not None and previous[0] is display and previous[1].width == width:
+            return previous[1]
+
+        if previous is None:
+            display.replay(draw, viewport=extent)
+        else:
+            old_display, old_image = previous
+            same = 0
+            count = min(len(old_display.ops), len(display.ops))
+            while same < count and (old_display.ops[same] is display.ops[same] or old_display.ops[same] == display.ops[same]):
+                same += 1
+
+            # leftmost column any added or removed primitive can touch, see DisplayList.replay
+            changed = old_display.ops[same:] + display.ops[same:]
+            left    = min((box[0] - kwargs.get("width", 1) - 4 / scale for box, _, _, kwargs in changed), default=x1)
+            column  = max(0, min(old_image.width, width, int((left - x0) * scale)))
+
+            # primitives reaching the kept columns paint there too, the copy goes over them
+            display.replay(draw, viewport=(x0 + column / scale, y0, x1, y1))
+            if column:
+                image.paste(old_image.crop((0, 0, column, height)), (0, 0))
+
+        if keep:
+            self._canvas = (scale, canvas, display, extent, image)
+        return image
+
+    def _window(self, options, layer_range, viewport, scale, height):
+        """
+        Record only the layers of a layer range or a pixel viewport
+
+        Returns:
+            (display, extent, scale): the recording, the diagram box to draw and the scale
+        """
+        palette, show_connectors, show_names, show_properties = options[:4]
+        placed, routes, extent = self._placement(palette, show_names, show_properties, *options[4:])
+        index = self._layer_index(show_names, show_properties)
+
+        if layer_range is not None:
+            first, last = (self._layer_position(item) for item in layer_range)
+            window = index.between(min(first, last), max(first, last))
+            box    = index.extent(window)
+            if height is not None:
+                scale = height / (box[3] - box[1])
+        else:
+            if height is not None:
+                scale = height / (extent[3] - extent[1])
+            left, top, right, bottom = viewport
+            box    = (extent[0] + left / scale, extent[1] + top / scale, extent[0] + right / scale, extent[1] + bottom / scale)
+            window = index.overlapping(box[0], box[2], neighbours=True)
+
+        display = DisplayList()
+        self._draw_layers(display, placed, show_connectors=show_connectors, show_names=show_names, show_properties=show_properties, routes=routes,
+                          window=window, x_range=(box[0], box[2]))
+        return display, box, scale
+
+    def _layer_position(self, item):
+        # position in model.layers of a layer given by position or name
         layers = self.model.layers
-        last_layer = None
-
-        # Draw input layer
-        shape = None
-        layer_name = utils.get_layer_name(layer=layers[0])
-
-        if layer_name == "Input": 
-            shape = layers[0].shape
-            del layers[0]
+        if isinstance(item, int):
+            return item + len(layers) if item < 0 else item
+        for i, layer in enumerate(layers):
+            if getattr(layer, "name", None) == item:
+                return i
+        raise ValueError("No layer named '{}'".format(item))
+
+    def _range_positions(self, layer_range):
+        # the fingerprint leaves names out, a range given by names is hashed by position
+        if layer_range is None:
+            return None
+        return tuple(self._layer_position(item) for item in layer_range)
+
+    def _annotation_positions(self, annotations):
+        # (position, text) pairs, for the same reason, annotations of unknown names are never drawn
+        positions = {}
+        for i, layer in enumerate(self.model.layers):
+            positions.setdefault(getattr(layer, "name", None), i)
+        return tuple(sorted((positions[name], text) for name, text in _annotations(annotations) if name in positions))
+
+    def _draw_layers(self, draw, placed, show_connectors=False, show_names=False, show_properties=False, routes=None, window=None, x_range=None, marks=None):
+        """
+        Draw placed layers and their connectors
+
+        Consecutive layers are connected unless routes (from a graph layout)
+        are given, the routed edges are drawn then and the layers without
+        outgoing edge get an output arrow.
+
+        Args:
+            window: sorted indices of the placed layers to draw, None draws every layer,
+                only the connectors and routes touching them are drawn
+            x_range: (x0, x1) routes crossing it are drawn too
+            marks: list extended with the number of primitives recorded on draw before every drawn layer
+        """
+        connector = Connector(scale=draw.scale)
+        drawn     = range(len(placed)) if window is None else window
+        inside    = set(drawn)
+
+        # layers, each followed by the connector from its predecessor
+        steps = drawn if window is None else sorted(inside | {i + 1 for i in inside if i + 1 < len(placed)})
+        for i in steps:
+            if i in inside:
+                if marks is not None:
+                    marks.append(len(draw))
+                placed[i].draw(image=draw, show_name=show_names, show_properties=show_properties, show_connectors=show_connectors)
+
+            if show_connectors and routes is None and i > 0:
+                connector.connect(image=draw, layer1=placed[i - 1], layer2=placed[i])
+
+        if not show_connectors:
+            return
+
+        if routes is None:
+            outputs = [placed[-1]]
         else:
-            shape = layers[0].input_shape
-
-        last_layer = InputLayer(name="Input", shape=shape, start_x=20, palette=palette)
-        last_layer.draw(image=image, show_name=show_names, show_properties=show_properties)
-        curr_layer = None
-
-        for layer in layers:
-            
-            layer_name = utils.get_layer_name(layer=layer)
-
-            if layer_name == "Flatten":
-                curr_layer = FlattenLayer(name=layer_name, input_shape=layer.input_shape, output_shape=layer.output_shape, start_x=last_layer.end, palette=palette)
-            
-            elif layer_name == "Dense":
-                activation = utils.get_activation_name(layer=layer)
-                curr_layer = DenseLayer(name=layer_name, units=layer.units, activation=activation, input_shape=layer.input_shape, output_shape=layer.output_shape, start_x=last_layer.end, palette=palette)
-            
-            elif layer_name == "Embedding":
-                curr_layer = EmbeddingLayer(name=layer_name, input_dim=layer.input_dim, output_dim=layer.output_dim, input_shape=layer.input_shape, output_shape=layer.output_shape, start_x=last_layer.end, palette=palette)
-
-            elif layer_name in utils.activations:
-                activation = None
-                if layer_name == "Activation":
-                    activation = utils.get_activation_name(layer=layer)
-                curr_layer = ActivationLayer(name=layer_name, activation=activation, start_x=last_layer.end, palette=palette)
-
-            elif layer_name in utils.convs:
-                activation = utils.get_activation_name(layer=layer)
-                curr_layer = ConvLayer(name=layer_name, filters=layer.filters, kernel=layer.kernel_size, activation=activation, input_shape=layer.input_shape, output_shape=layer.output_shape, start_x=last_layer.end, palette=palette)
-
-            elif layer_name in utils.pools:
-                curr_layer = PoolingLayer(name=layer_name, pool_size=layer.pool_size, padding=layer.padding, input_shape=layer.input_shape, output_shape=layer.output_shape, start_x=last_layer.end, palette=palette)
-
-            elif layer_name in utils.rnns:
-                bi = False
-                if layer_name == 'Bidirectional':
-                    bi = True
-                    layer = layer.layer
-                    layer_name = "Bi(" + utils.get_layer_name(layer) + ")"
-
-                activation = utils.get_activation_name(layer=layer)
-                curr_layer = RecurrentLayer(name=layer_name, units=layer.units, activation=activation, bi=bi, start_x=last_layer.end, palette=palette)
-
-            elif layer_name in utils.convlstms:
-                activation = utils.get_activation_name(layer=layer)
-                curr_layer = ConvLayer(name=layer_name, filters=layer.filters, kernel=layer.kernel_size, activation=activation, input_shape=layer.input_shape, output_shape=layer.output_shape, start_x=last_layer.end, palette=palette)
-
-            elif layer_name in utils.dropouts:
-                curr_layer = DropoutLayer(layer_name, rate=layer.rate, start_x=last_layer.end, palette=palette)
-            
-            elif layer_name in utils.normalizations:
-                curr_layer = NormalizationLayer(layer_name, start_x=last_layer.end, palette=palette)
-            
-            else:
-                curr_layer = Layer(layer_name, start_x=last_layer.end, palette=palette)
-
-            curr_layer.draw(image=image, show_name=show_names, show_properties=show_properties)
-
-            if show_connectors:
-                connector.connect(image=image, layer1=last_layer, layer2=curr_layer)
+            sources = set()
+            ids     = {id(placed[i]) for i in inside}
+            for source, target, points in routes:
+                sources.add(id(source))
+                xs = [x for x, _ in points]
+                if window is None or id(source) in ids or id(target) in ids or (x_range is not None and max(xs) >= x_range[0] and min(xs) <= x_range[1]):
+                    connector.route(image=draw, points=points)
+            outputs = [layer for layer in placed if id(layer) not in sources]
+
+        for layer in outputs:
+            if window is None or id(layer) in {id(placed[i]) for i in inside}:
+                connector.output(image=draw, layer1=layer)
+
+
+    def feature_extractor(self, layers=None):
+        """
+        Get the extractor of the outputs of layers, built once and reused
+
+        Args:
+            layers: None for the convolutions, class names, a predicate or the keras
+                layers themselves, see litten.visualize.features.select_layers
+
+        Returns:
+            litten.visualize.features.FeatureExtractor
+        """
+        layers = select_layers(self.model.layers, layers)
+        key    = tuple(id(layer) for layer in layers)
+        if key not in self._extractors:
+            self._extractors[key] = FeatureExtractor(self.model, layers)
+        return self._extractors[key]
+
+    def featuremaps(self, inputs, batch_size=32, layers=None):
+        """
+        Feature maps of many inputs, computed batch by batch
+
+        Args:
+            inputs: array of images, iterable of images or tf.data.Dataset,
+                see litten.visualize.features.FeatureExtractor.batches
+            batch_size: images per forward pass
+            layers: layers, class names or predicate, see feature_extractor
+
+        Yields:
+            (index, maps): position of the image and {layer name: its feature map}
+        """
+        return self.feature_extractor(layers).stream(inputs, batch_size=batch_size)
+
+    def activation_stats(self, inputs, batch_size=32, layers=None, bins=32, range=None):
+        """
+        Per channel statistics of the feature maps over many inputs
+
+        Args:
+            inputs, batch_size, layers: as in featuremaps
+            bins, range: histogram bins and (low, high), see litten.visualize.features.ChannelStats
+
+        Returns:
+            {layer name: litten.visualize.features.ChannelStats}, pass it as
+            visualize_model(annotations=...) to show them on the diagram
+        """
+        extractor  = self.feature_extractor(layers)
+        statistics = {name: ChannelStats(bins=bins, range=range) for name in extractor.names}
+        for outputs in extractor.batches(inputs, batch_size=batch_size):
+            for name, output in zip(extractor.names, outputs):
+                statistics[name].update(output)
+        return statistics
+
+    def dump_activations(self, inputs, directory, count=None, batch_size=32, layers=None):
+        """
+        Write the feature maps of many inputs to memory mapped files
+
+        Args:
+            inputs, batch_size, layers: as in featuremaps
+            directory: dump directory, see litten.visualize.activations
+            count: number of inputs, needed for datasets and when inputs has no len (generators)
+
+        Returns:
+            litten.visualize.activations.ActivationReader over the dump
+        """
+        if count is None:
+            # the length of a batched dataset counts batches, not inputs
+            if hasattr(inputs, "element_spec"):
+                raise ValueError("count is needed when inputs is a tf.data.Dataset")
+            try:
+                count = len(inputs)
+            except TypeError:
+                raise ValueError("count is needed when inputs has no length")
+
+        extractor = self.feature_extractor(layers)
+        shapes    = {layer.name: tuple(layer.output.shape[1:]) for layer in extractor.layers}
+        dtypes    = {layer.name: getattr(layer.output.dtype, "name", layer.output.dtype) for layer in extractor.layers}
+        with ActivationWriter(directory, count, shapes, dtypes) as writer:
+            for outputs in extractor.batches(inputs, batch_size=batch_size):
+                writer.write(outputs)
+        return ActivationReader(directory)
+
+    def featuremap_mosaics(self, input_image, downsample=1, layers=None, top_k=None):
+        """
+        Feature maps of one image, every layer tiled into one grayscale image
+
+        Args:
+            input_image: one model input, without batch axis
+            downsample: keep one pixel out of downsample, see litten.visualize.features.mosaic
+            layers: layers, class names or predicate, see feature_extractor
+            top_k: only tile the k channels of highest mean activation, strongest first
+
+        Returns:
+            {layer name: uint8 array}, PIL.Image.fromarray saves them without matplotlib
+        """
+        import numpy as np
+
+        extractor = self.feature_extractor(layers)
+        outputs   = extractor(np.expand_dims(input_image, axis=0))
+        mosaics   = {}
+        for name, features in zip(extractor.names, outputs):
+            channels      = None if top_k is None else top_channels(channel_scores(features[0]), top_k)
+            mosaics[name] = mosaic(features[0], downsample=downsample, channels=channels)
+        return mosaics
+
+    def visualize_featuremap(self, input_image, cmap = "gray", downsample=1, layers=None, top_k=None):
+        import numpy as np
+        import matplotlib.pyplot as plt
 
-            last_layer = curr_layer
-        
-        if show_connectors:
-            connector.output(image=image, layer1=last_layer)
-
-        display(image)
-
-
-    def visualize_featuremap(self, input_image, cmap = "gray"):
-
-        image = np.expand_dims(input_image, axis=0)
-        
         fig = plt.figure()
         fig.suptitle("{}".format("Input Image") , fontsize=18)
-        plt.imshow(input_image.numpy().astype("uint8"))
+        plt.imshow(np.asarray(input_image).astype("uint8"))
 
-        for layer in self.model.layers:  
-
-            if 'conv' not in layer.name:
-                continue    
-            
-            
-            intermediate_model = Model(inputs=self.model.inputs , outputs=layer.output)
-            features = intermediate_model.predict(image)
+        for name, image in self.featuremap_mosaics(input_image, downsample=downsample, layers=layers, top_k=top_k).items():
 
             fig = plt.figure(figsize=(20, 20))
-            fig.suptitle("{}".format(layer.name) , fontsize=18)
-
-            for i in range(1, features.shape[3]+1):
-                plt.subplot(8,8,i)
-                plt.imshow(features[0,:,:,i-1] , cmap=cmap)
+            fig.suptitle("{}".format(name) , fontsize=18)
+            plt.imshow(image, cmap=cmap)
+            plt.axis("off")
 
             plt.show()
     
-    def visualize_filters(self, cmap = "gray"):
-    
-        for layer in self.model.layers:  
+    def visualize_filters(self, cmap = "gray", layers=None, top_k=6):
+        import matplotlib.pyplot as plt
 
-            if 'conv' not in layer.name:
-                continue    
-            
-            filters, _ = layer.get_weights()
+        for layer in select_layers(self.model.layers, layers):
+
+            weights = layer.get_weights()
+            if not weights or weights[0].ndim != 4:
+                continue
+            filters = weights[0]
 
             fig = plt.figure(figsize=(10,10))
             fig.suptitle("{}".format(layer.name) , fontsize=18)
 
+            # filters of highest L1 norm first
+            ranked = top_channels(filter_scores(filters), top_k)
+
             idx=1
-            no_filters = 6
+            no_filters = len(ranked)
 
-            for i in range(no_filters):
+            for i in ranked:
                 filter = filters[:,:,:,i]
                 ch = min(filter.shape[2], 3)
                 for j in range(ch):
@@ -159,3 +620,26 @@ class ModelVisualizer:
                     plt.imshow(filter[:,:,j], cmap=cmap)
                     idx += 1
             plt.show()
+
+
+def _new_image(size, background_color, palette, image_mode):
+    # blank raster canvas, indexed canvases get the colors of the palette
+    if image_mode == "RGB":
+        return Image.new("RGB", size, color=background_color)
+    if image_mode != "P":
+        raise ValueError("Unknown image mode '{}', expected 'RGB' or 'P'".format(image_mode))
+    image = Image.new("P", size, 0)
+    image.putpalette([value for color in indexed_colors(utils.palettes[palette], background_color) for value in color])
+    return image
+
+
+def _annotations(annotations):
+    # hashable (name, text) pairs, statistics are summarized
+    if not annotations:
+        return ()
+    return tuple(sorted((name, value.summary() if hasattr(value, "summary") else str(value)) for name, value in annotations.items()))
+
+
+def _record_signature(record):
+    # everything a record draws, its name included
+    return json.dumps(record.to_dict(), sort_keys=True, default=str)
@@ -30,5 +30,13 @@ setup(
     install_requires=[
         'Pillow>=9.3.0',
     ],
+    extras_require={
+        'msgpack': ['msgpack'],
+    },
+    entry_points={
+        'console_scripts': [
+            'litten-batch=litten.batch:main',
+        ],
+    },
     python_requires='>=3.6',
 )
\ No newline at end of file
@@ -18,4 +18,26 @@ def model():
     model.add(layers.Flatten())
     model.add(layers.Dense(64, activation='relu'))
     model.add(layers.Dense(10))
-    return model
\ No newline at end of file
+    return model
+
+
+def fake_layer(class_name, inbound=None, **attributes):
+    """
+    Stand-in for a keras layer, litten only reads its class name and attributes
+
+    Args:
+        class_name: keras class name the layer pretends to be
+        inbound: layers feeding it, sets the inbound nodes read by graph layouts
+        attributes: layer attributes (name, rate, units, shape...)
+    """
+    layer = type(class_name, (), attributes)()
+    if inbound is not None:
+        layer._inbound_nodes = [type("Node", (), {"inbound_layers": list(inbound)})()] if inbound else []
+    return layer
+
+
+def fake_model(layers, class_name="Sequential", **attributes):
+    """
+    Stand-in for a keras model holding layers
+    """
+    return fake_layer(class_name, layers=list(layers), **attributes)
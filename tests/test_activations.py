@@ -0,0 +1,59 @@
+import numpy as np
+
+from litten.visualize.activations import ActivationReader, ActivationWriter
+from litten.visualize.visualize import ModelVisualizer
+
+
+class TestActivations:
+
+    def test_round_trip(self, tmp_path):
+        rng    = np.random.default_rng(0)
+        first  = rng.normal(size=(7, 4, 4, 3)).astype("float32")
+        second = rng.integers(0, 9, size=(7, 5)).astype("int16")
+
+        with ActivationWriter(str(tmp_path), 10, {"conv/1": (4, 4, 3), "dense": (5,)}, {"dense": "int16"}) as writer:
+            for start in range(0, 7, 3):
+                writer.write([first[start:start + 3], second[start:start + 3]])
+
+        reader = ActivationReader(str(tmp_path))
+        assert len(reader) == 7 and reader.names == ["conv/1", "dense"]
+        assert isinstance(reader["conv/1"], np.memmap)
+        assert np.array_equal(reader["conv/1"], first)
+        assert np.array_equal(reader.channel("conv/1", 2), first[..., 2])
+        assert reader.input(3)["dense"].dtype == np.int16 and np.array_equal(reader.input(3)["dense"], second[3])
+
+    def test_overflow(self, tmp_path):
+        writer = ActivationWriter(str(tmp_path), 2, {"dense": (5,)})
+        try:
+            writer.write([np.zeros((3, 5))])
+        except ValueError:
+            return
+        assert False
+
+    def test_model_dump(self, model, tmp_path):
+        images     = np.random.default_rng(0).uniform(0, 255, size=(5, 32, 32, 3)).astype("float32")
+        visualizer = ModelVisualizer(model)
+
+        reader   = visualizer.dump_activations(iter(images), str(tmp_path), count=5, batch_size=2)
+        expected = visualizer.feature_extractor()(images)
+        for name, output in zip(reader.names, expected):
+            assert np.allclose(reader[name], output, atol=1e-4)
+
+    def test_batched_dataset_dump(self, model, tmp_path):
+        import tensorflow as tf
+
+        images     = np.random.default_rng(0).uniform(0, 255, size=(10, 32, 32, 3)).astype("float32")
+        visualizer = ModelVisualizer(model)
+        dataset    = tf.data.Dataset.from_tensor_slices(images).batch(4)
+
+        try:
+            visualizer.dump_activations(dataset, str(tmp_path / "missing"))
+            assert False
+        except ValueError as e:
+            assert "count" in str(e)
+
+        reader   = visualizer.dump_activations(dataset, str(tmp_path / "dump"), count=10)
+        expected = visualizer.feature_extractor()(images)
+        assert len(reader) == 10
+        for name, output in zip(reader.names, expected):
+            assert np.allclose(reader[name], output, atol=1e-4)
@@ -0,0 +1,69 @@
+from litten import batch
+
+
+class TestBatch:
+
+    def test_find_models(self, tmp_path):
+        (tmp_path / "a.keras").write_bytes(b"")
+        (tmp_path / "b.h5").write_bytes(b"")
+        (tmp_path / "notes.txt").write_text("")
+        (tmp_path / "saved").mkdir()
+        (tmp_path / "saved" / "saved_model.pb").write_bytes(b"")
+        (tmp_path / "other").mkdir()
+
+        found = batch.find_models([str(tmp_path)])
+        assert [p.split("/")[-1] for p in found] == ["a.keras", "b.h5", "saved"]
+        assert batch.find_models([str(tmp_path / "saved")]) == [str(tmp_path / "saved")]
+
+    def test_unique_names(self):
+        jobs = batch._unique_names(["x/model.h5", "y/model.h5", "y/other.keras"])
+        assert [name for _, name in jobs] == ["model", "model_2", "other"]
+
+    def test_ir_models(self, tmp_path):
+        from litten.ir import LayerRecord, ModelIR
+
+        model = ModelIR("tiny", [LayerRecord("InputLayer", input_shape=(None, 8)), LayerRecord("Dropout", config={"rate": 0.5}, inbound=[0])])
+        model.save(str(tmp_path / "tiny.litten.json"))
+
+        assert batch.find_models([str(tmp_path)]) == [str(tmp_path / "tiny.litten.json")]
+        assert batch._unique_names([str(tmp_path / "tiny.litten.json")])[0][1] == "tiny"
+
+        record = batch._render_model(str(tmp_path / "tiny.litten.json"), "tiny", str(tmp_path), "png", True, False, {"scale": 0.05})
+        assert record["error"] is None
+        assert (tmp_path / "tiny.png").exists()
+        assert "Dropout" in (tmp_path / "tiny.txt").read_text()
+
+    def test_render_models(self, tmp_path):
+        import json
+        from litten.ir import LayerRecord, ModelIR
+
+        models = tmp_path / "models"
+        models.mkdir()
+        for name, rate in (("first", 0.1), ("second", 0.2), ("third", 0.3)):
+            ModelIR(name, [LayerRecord("InputLayer", input_shape=(None, 8)), LayerRecord("Dropout", config={"rate": rate}, inbound=[0])]).save(
+                str(models / "{}.litten.json".format(name)))
+        (models / "broken.litten.json").write_text("{")
+
+        output   = tmp_path / "out"
+        manifest = batch.render_models([str(models)], str(output), workers=2, scale=0.05)
+
+        assert json.loads((output / "manifest.json").read_text()) == manifest
+        assert manifest["options"] == {"scale": 0.05} and manifest["total_seconds"] > 0
+        assert [record["name"] for record in manifest["models"]] == ["broken", "first", "second", "third"]
+
+        broken, *rendered = manifest["models"]
+        assert broken["error"] is not None and broken["diagram"] is None
+        for record in rendered:
+            assert record["error"] is None
+            assert (output / "{}.png".format(record["name"])).exists() and (output / "{}.txt".format(record["name"])).exists()
+            assert all(record[key] >= 0 for key in ("load_seconds", "render_seconds", "summary_seconds"))
+
+    def test_main(self, tmp_path, capsys):
+        from litten.ir import LayerRecord, ModelIR
+
+        ModelIR("tiny", [LayerRecord("InputLayer", input_shape=(None, 8))]).save(str(tmp_path / "tiny.litten.json"))
+
+        output = tmp_path / "out"
+        assert batch.main([str(tmp_path / "tiny.litten.json"), "-o", str(output), "-j", "2", "--format", "svg", "--scale", "0.05"]) == 0
+        assert (output / "tiny.svg").read_text().startswith("<svg")
+        assert "1 models rendered, 0 failed" in capsys.readouterr().out
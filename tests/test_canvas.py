@@ -0,0 +1,25 @@
+from PIL import Image
+
+from litten.layers import DenseLayer
+from litten.layers.canvas import ScaledDraw
+from litten.visualize.palettes import Default
+
+
+class TestScaledDraw:
+
+    def test_coordinates_are_scaled(self):
+        image = Image.new("RGB", (100, 100), color="#ffffff")
+        draw  = ScaledDraw(image, scale=0.1)
+        draw.rectangle([(200, 200), (400, 400)], fill="#000000")
+
+        assert image.getpixel((30, 30)) == (0, 0, 0)
+        assert image.getpixel((50, 50)) == (255, 255, 255)
+
+    def test_layer_scale(self):
+        image = Image.new("RGB", (80, 320), color="#ffffff")
+        layer = DenseLayer("Dense", 10, "relu", (None, 64), (None, 10), start_x=0, palette=Default, scale=0.1)
+        layer.draw(image, show_properties=True)
+
+        assert layer.end == 800
+        assert image.getpixel((25, 65)) != (255, 255, 255)
+        assert layer.bounds()[3] == 2200
@@ -0,0 +1,77 @@
+from PIL import Image, ImageChops
+
+from litten.layers import ConvLayer, DenseLayer
+from litten.layers.canvas import ScaledDraw
+from litten.layers.display import DisplayList
+from litten.layers.svg import SVGDraw
+from litten.visualize.palettes import Default
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+def _layers():
+    dense = DenseLayer("Dense", 10, "relu", (None, 64), (None, 10), start_x=0, palette=Default)
+    conv  = ConvLayer("Conv2D", 32, (3, 3), "relu", (None, 32, 32, 3), (None, 30, 30, 32), start_x=dense.layout(), palette=Default)
+    conv.layout()
+    return [dense, conv]
+
+
+class TestDisplayList:
+
+    def test_replay_matches_direct_drawing(self):
+        direct   = Image.new("RGB", (300, 320), color="#ffffff")
+        replayed = Image.new("RGB", (300, 320), color="#ffffff")
+
+        display = DisplayList()
+        for layer in _layers():
+            layer.draw(ScaledDraw(direct, scale=0.1), show_properties=True)
+            layer.draw(display, show_properties=True)
+        display.replay(ScaledDraw(replayed, scale=0.1))
+
+        assert ImageChops.difference(direct, replayed).getbbox() is None
+
+    def test_replay_at_other_scales_and_backends(self):
+        display = DisplayList()
+        for layer in _layers():
+            layer.draw(display, show_name=True)
+
+        small = Image.new("RGB", (150, 160), color="#ffffff")
+        large = Image.new("RGB", (600, 640), color="#ffffff")
+        assert display.replay(ScaledDraw(small, scale=0.05)) == display.replay(ScaledDraw(large, scale=0.2))
+
+        svg = SVGDraw((3000, 3200))
+        display.replay(svg)
+        assert svg.tostring().count("<text") == 2
+
+    def test_culling(self):
+        display = DisplayList()
+        for layer in _layers():
+            layer.draw(display)
+
+        everything = display.replay(DisplayList())
+        left_only  = display.replay(DisplayList(), viewport=(0, 0, 700, 3200))
+        assert 0 < left_only < everything
+
+    def test_consecutive_duplicates_dropped(self):
+        display = DisplayList()
+        display.line([(0, 0), (10, 10)], fill="#000000")
+        display.line([(0, 0), (10, 10)], fill="#000000")
+        display.rectangle([0, 0, 5, 5], fill="#000000")
+        display.line([(0, 0), (10, 10)], fill="#000000")
+
+        assert len(display) == 3
+        assert display.bounds() == (0, 0, 10, 10)
+
+    def test_visualizer_reuses_recording(self):
+        model = fake_model([fake_layer("Input", shape=(None, 8)), fake_layer("Dropout", rate=0.5)])
+        visualizer = ModelVisualizer(model)
+
+        visualizer.visualize_model(scale=0.05, output="image")
+        display = visualizer._display[1]
+        visualizer.visualize_model(scale=0.1, output="image")
+        visualizer.visualize_model(backend="svg", output="image")
+        assert visualizer._display[1] is display
+
+        visualizer.visualize_model(scale=0.1, output="image", show_names=True)
+        assert visualizer._display[1] is not display
@@ -0,0 +1,235 @@
+import numpy as np
+
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer
+
+
+def _images(count=2):
+    return np.random.default_rng(0).uniform(0, 255, size=(count, 32, 32, 3)).astype("float32")
+
+
+class TestFeatureExtractor:
+
+    def test_one_pass_for_every_layer(self, model):
+        from tensorflow.keras.models import Model
+
+        visualizer = ModelVisualizer(model)
+        extractor  = visualizer.feature_extractor()
+        features   = extractor(_images())
+
+        assert extractor.names == [layer.name for layer in model.layers if "conv" in layer.name]
+        for layer, output in zip(extractor.layers, features):
+            expected = Model(inputs=model.inputs, outputs=layer.output).predict(_images(), verbose=0)
+            assert np.allclose(output, expected, atol=1e-4)
+
+    def test_built_and_traced_once(self, model):
+        visualizer = ModelVisualizer(model)
+        extractor  = visualizer.feature_extractor()
+
+        extractor(_images())
+        extractor(_images())
+        assert visualizer.feature_extractor() is extractor
+        assert extractor._call.experimental_get_tracing_count() == 1
+
+        single = visualizer.feature_extractor(model.layers[:1])
+        assert single is not extractor and len(single(_images())) == 1
+
+
+class TestFeatureStream:
+
+    def test_inputs_kinds(self, model):
+        import tensorflow as tf
+
+        visualizer = ModelVisualizer(model)
+        images     = _images(5)
+        expected   = visualizer.feature_extractor()(images)
+
+        streams = [visualizer.featuremaps(images, batch_size=2),
+                   visualizer.featuremaps(iter(images), batch_size=3),
+                   visualizer.featuremaps(((image, 0) for image in images), batch_size=4),
+                   visualizer.featuremaps(tf.data.Dataset.from_tensor_slices(images), batch_size=2),
+                   visualizer.featuremaps(tf.data.Dataset.from_tensor_slices((images, np.zeros(5))).batch(4))]
+        for stream in streams:
+            results = list(stream)
+            assert [index for index, _ in results] == list(range(5))
+            for index, maps in results:
+                for name, output in zip(visualizer.feature_extractor().names, expected):
+                    assert np.allclose(maps[name], output[index], atol=1e-4)
+
+    def test_batches(self, model):
+        extractor = ModelVisualizer(model).feature_extractor()
+        sizes     = [len(outputs[0]) for outputs in extractor.batches(_images(7), batch_size=3)]
+        assert sizes == [3, 3, 1]
+
+
+class TestMosaic:
+
+    def test_tiles(self):
+        from litten.visualize.features import mosaic
+
+        features = np.arange(4 * 3 * 5, dtype="float32").reshape(4, 3, 5)
+        image    = mosaic(features)
+
+        # 5 channels on a 3 x 2 grid of 4 x 3 tiles, 1 pixel apart
+        assert image.shape == (2 * 5 - 1, 3 * 4 - 1) and image.dtype == np.uint8
+        for channel in range(5):
+            row, column = divmod(channel, 3)
+            tile = image[row * 5:row * 5 + 4, column * 4:column * 4 + 3]
+            assert tile.min() == 0 and tile.max() == 255
+            assert np.array_equal(np.argsort(tile, axis=None), np.argsort(features[:, :, channel], axis=None))
+
+    def test_shapes(self):
+        from litten.visualize.features import mosaic
+
+        assert mosaic(np.ones((64, 64, 512)), downsample=4).shape == (23 * 17 - 1, 23 * 17 - 1)
+        assert mosaic(np.ones((10, 8)), columns=8, padding=0).shape == (1, 80)
+        assert not mosaic(np.ones((6, 6, 2))).any()
+
+    def test_layer_mosaics(self, model):
+        mosaics = ModelVisualizer(model).featuremap_mosaics(_images(1)[0])
+
+        assert [image.ndim for image in mosaics.values()] == [2, 2, 2]
+        assert list(mosaics.values())[1].shape == (8 * 14 - 1, 8 * 14 - 1)
+
+
+    def test_no_layers(self, tmp_path):
+        from tensorflow.keras import layers, models
+
+        model      = models.Sequential([layers.Input((8,)), layers.Dense(4), layers.Dense(2)])
+        visualizer = ModelVisualizer(model)
+        inputs     = np.zeros((3, 8), dtype="float32")
+
+        assert len(visualizer.feature_extractor()) == 0
+        assert list(visualizer.featuremaps(inputs)) == []
+        assert visualizer.activation_stats(inputs) == {}
+        assert visualizer.featuremap_mosaics(inputs[0]) == {}
+        assert visualizer.dump_activations(inputs, str(tmp_path)).names == []
+
+
+class TestChannelStats:
+
+    def test_matches_numpy(self):
+        from litten.visualize.features import ChannelStats
+
+        values = np.random.default_rng(1).normal(size=(10, 4, 4, 3))
+        values[..., 2] = np.maximum(values[..., 2], 0)
+        values[..., 1] = 0
+
+        stats = ChannelStats(bins=8)
+        for start in range(0, 10, 3):
+            stats.update(values[start:start + 3])
+
+        flat = values.reshape(-1, 3)
+        assert stats.count == len(flat)
+        assert np.allclose(stats.mean, flat.mean(axis=0))
+        assert np.allclose(stats.variance, flat.var(axis=0))
+        assert np.array_equal(stats.max, flat.max(axis=0))
+        assert np.allclose(stats.zero_fraction, (flat == 0).mean(axis=0))
+        assert stats.histogram.shape == (3, 8)
+        assert (stats.histogram.sum(axis=1) + stats.underflow + stats.overflow == len(flat)).all()
+        assert list(stats.dead_channels()) == [1]
+
+    def test_histogram_range(self):
+        from litten.visualize.features import ChannelStats
+
+        values = np.random.default_rng(2).normal(size=(12, 5, 2))
+        values[:6] *= 0.1
+
+        # the first batches only span a tenth of the values, the rest is counted apart
+        ordered = ChannelStats(bins=4)
+        for start in range(0, 12, 3):
+            ordered.update(values[start:start + 3])
+        flat  = values.reshape(-1, 2)
+        edges = ordered.bin_edges
+        assert (ordered.underflow == (flat < edges[0]).sum(axis=0)).all()
+        assert (ordered.overflow == (flat > edges[-1]).sum(axis=0)).all()
+
+        fixed = ChannelStats(bins=4, range=(-5, 5))
+        for start in (9, 0, 6, 3):
+            fixed.update(values[start:start + 3])
+        for channel in range(2):
+            expected, _ = np.histogram(flat[:, channel], bins=4, range=(-5, 5))
+            assert np.array_equal(fixed.histogram[channel], expected)
+        assert not fixed.underflow.any() and not fixed.overflow.any()
+
+    def test_model_overlay(self, model):
+        visualizer = ModelVisualizer(model)
+        statistics = visualizer.activation_stats(_images(5), batch_size=2)
+
+        assert list(statistics) == visualizer.feature_extractor().names
+        assert all(stats.count == 5 * np.prod(model.get_layer(name).output.shape[1:3]) for name, stats in statistics.items())
+
+        plain     = visualizer.visualize_model(scale=0.05, output="image", collapse_repeats=False)
+        annotated = visualizer.visualize_model(scale=0.05, output="image", collapse_repeats=False, annotations=statistics)
+        assert annotated.height > plain.height
+        placed = visualizer._layout[2][0]
+        assert [layer.annotation is not None for layer in placed].count(True) == 3
+
+        # the pooling, conv pairs run at other resolutions, nothing is collapsed
+        visualizer.visualize_model(scale=0.05, output="image", annotations=statistics)
+        placed = visualizer._layout[2][0]
+        assert [layer.annotation is not None for layer in placed].count(True) == 3
+
+
+class TestLayerSelection:
+
+    def _layers(self):
+        renamed   = fake_layer("Conv2D", name="features")
+        impostor  = fake_layer("Dense", name="conv_head")
+        separable = fake_layer("SeparableConv2D", name="separable")
+        return [renamed, impostor, separable]
+
+    def test_by_class(self):
+        from litten.visualize.features import select_layers
+
+        layers = self._layers()
+        assert select_layers(layers) == [layers[0], layers[2]]
+        assert select_layers(layers, "Dense") == [layers[1]]
+        assert select_layers(layers, ["Dense", "Conv2D"]) == [layers[0], layers[1]]
+
+    def test_by_predicate(self):
+        from litten.visualize.features import select_layers
+
+        layers = self._layers()
+        assert select_layers(layers, lambda layer: layer.name.startswith("s")) == [layers[2]]
+        assert select_layers(layers, [layers[1]]) == [layers[1]]
+
+
+class TestChannelRanking:
+
+    def test_top_channels(self):
+        from litten.visualize.features import channel_scores, filter_scores, top_channels
+
+        features = np.zeros((4, 4, 5), dtype=np.float32)
+        features[..., 1] = -3
+        features[..., 3] = 2
+        features[0, 0, 4] = 1
+        assert np.allclose(channel_scores(features), [0, 3, 0, 2, 1 / 16])
+        assert list(top_channels(channel_scores(features), 2)) == [1, 3]
+        assert list(top_channels(channel_scores(features), None))[:3] == [1, 3, 4]
+
+        kernel = np.ones((3, 3, 2, 4), dtype=np.float32) * np.array([1, -4, 2, 0])
+        assert np.allclose(filter_scores(kernel), [18, 72, 36, 0])
+
+    def test_filters_of_any_selection(self, model):
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        # pooling has no weights, dense kernels are 2D, only the convolutions are plotted
+        visualizer = ModelVisualizer(model)
+        visualizer.visualize_filters(layers=["MaxPooling2D", "Dense", "Conv2D"], top_k=2)
+        assert len(plt.get_fignums()) == 3
+        plt.close("all")
+
+    def test_top_k_mosaic(self, model):
+        from litten.visualize.features import channel_scores, mosaic, top_channels
+
+        visualizer = ModelVisualizer(model)
+        extractor  = visualizer.feature_extractor()
+        features   = extractor(_images(1))[0][0]
+        mosaics    = visualizer.featuremap_mosaics(_images(1)[0], top_k=4)
+        best       = top_channels(channel_scores(features), 4)
+        assert mosaics[extractor.names[0]].shape == (2 * 30 + 1, 2 * 30 + 1)
+        assert np.array_equal(mosaics[extractor.names[0]], mosaic(features, channels=best))
@@ -0,0 +1,16 @@
+from litten.layers import fonts
+
+
+class TestFonts:
+
+    def test_get_font_is_cached(self):
+        assert fonts.get_font(100) is fonts.get_font(100)
+        assert fonts.get_font(100) is not fonts.get_font(50)
+
+    def test_missing_font_falls_back(self):
+        try:
+            fonts.set_font("/nonexistent/font.ttf")
+            assert fonts.get_font_path() == "/nonexistent/font.ttf"
+            assert fonts.get_font(40).getbbox("Conv2D")[2] > 0
+        finally:
+            fonts.set_font(None)
@@ -0,0 +1,124 @@
+import time
+
+from PIL import Image, ImageChops
+
+from litten import utils
+from litten.layers.canvas import ScaledDraw
+from litten.visualize import graph, layout
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+def _residual_model():
+    x = fake_layer("InputLayer", inbound=[], shape=(None, 16))
+    a = fake_layer("BatchNormalization", inbound=[x])
+    b = fake_layer("Dropout", inbound=[a], rate=0.5)
+    c = fake_layer("BatchNormalization", inbound=[b])
+    d = fake_layer("Add", inbound=[c, x])
+    return fake_model([x, a, b, c, d], class_name="Functional")
+
+
+class TestGraph:
+
+    def test_ranks(self):
+        assert graph.assign_ranks(4, [(0, 1), (1, 2), (0, 2), (2, 3)]) == [0, 1, 2, 3]
+        assert graph.assign_ranks(3, [(0, 2), (1, 2)]) == [0, 0, 1]
+
+    def test_cycle(self):
+        try:
+            graph.topological_order(2, [(0, 1), (1, 0)])
+        except ValueError:
+            return
+        assert False
+
+    def test_chain(self):
+        assert graph.is_chain(3, [(0, 1), (1, 2)])
+        assert not graph.is_chain(3, [(0, 1), (0, 2)])
+        assert not graph.is_chain(4, [(0, 1), (1, 2), (0, 2)])
+
+    def test_dummies(self):
+        result = graph.layered_layout(3, [(0, 1), (1, 2), (0, 2)])
+
+        assert len(result.paths[2]) == 3
+        assert result.is_dummy(result.paths[2][1])
+        assert result.rank[result.paths[2][1]] == 1
+
+    def test_crossing_reduction(self):
+        # two sources whose children start in crossed order
+        edges  = [(0, 3), (1, 2), (2, 4), (3, 5)]
+        result = graph.layered_layout(6, edges, sweeps=0)
+        sorted_result = graph.layered_layout(6, edges)
+
+        assert graph.count_crossings(sorted_result) <= graph.count_crossings(result)
+        assert graph.count_crossings(sorted_result) == 0
+
+    def test_large_graph(self):
+        n     = 2000
+        edges = [(i, i + 1) for i in range(n - 1)] + [(i, i + 3) for i in range(0, n - 3, 3)]
+
+        start  = time.perf_counter()
+        result = graph.layered_layout(n, edges)
+        assert time.perf_counter() - start < 2
+        assert len(result.paths) == len(edges)
+
+
+class TestGraphLayout:
+
+    def test_model_edges(self):
+        model = _residual_model()
+        assert layout.model_edges(model.layers) == [(0, 1), (0, 4), (1, 2), (2, 3), (3, 4)]
+
+    def test_layout_mode(self):
+        model = _residual_model()
+
+        _, routes = layout.layout_model(model.layers, palette=utils.palettes["default"], mode="chain")
+        assert routes is None
+
+        placed, routes = layout.layout_model(model.layers, palette=utils.palettes["default"])
+        assert len(routes) == 5
+        for source, target, points in routes:
+            assert points[0][0] <= points[-1][0]
+            assert source.start < target.start
+
+        # the skip connection runs on its own row, through the residual branch columns
+        _, _, points = routes[1]
+        assert placed[1].start_y != placed[0].start_y
+        assert len(points) > 4
+
+    def test_render(self):
+        visualizer = ModelVisualizer(_residual_model())
+
+        image = visualizer.visualize_model(scale=0.05, show_connectors=True, show_names=True, output="image")
+        chain = visualizer.visualize_model(scale=0.05, show_connectors=True, show_names=True, output="image", layout_mode="chain")
+
+        assert image.size != chain.size
+        assert visualizer.visualize_model(backend="svg", show_connectors=True, output="image").startswith("<svg")
+
+    def test_off_centre_glyphs(self):
+        visualizer = ModelVisualizer(_residual_model())
+        image      = visualizer.visualize_model(scale=0.05, output="image")
+        _, _, (placed, _, extent), _ = visualizer._layout
+
+        moved = [layer for layer in placed if layer.start_y != 0]
+        assert moved
+        for layer in moved:
+            alone = Image.new("RGB", image.size, "white")
+            layer.draw(ScaledDraw(alone, scale=0.05, origin=extent[:2]))
+            box = ImageChops.invert(alone.convert("L")).getbbox()
+            assert ImageChops.difference(image.crop(box), alone.crop(box)).getbbox() is None
+
+    def test_sprites_shared_with_chains(self):
+        from litten.layers.sprites import sprite_cache
+
+        def chain():
+            model = fake_model(_residual_model().layers[:4])
+            return ModelVisualizer(model).visualize_model(scale=0.05, output="image")
+
+        sprite_cache.clear()
+        before = chain()
+
+        # glyph sprites are keyed without position, the graph render fills the cache first
+        sprite_cache.clear()
+        ModelVisualizer(_residual_model()).visualize_model(scale=0.05, output="image")
+        assert ImageChops.difference(before, chain()).getbbox() is None
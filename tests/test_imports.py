@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_modules(statement):
+    code = "import sys; {}; print(' '.join(sys.modules))".format(statement)
+    out  = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return set(out.stdout.split())
+
+
+class TestImports:
+
+    def test_import_is_light(self):
+        modules = _loaded_modules("import litten")
+        for heavy in ["tensorflow", "keras", "IPython", "matplotlib", "litten.visualize.visualize", "litten.visualize.features"]:
+            assert heavy not in modules
+
+    def test_visualize_package_is_lazy(self):
+        modules = _loaded_modules("from litten.visualize import ModelVisualizer")
+        assert "litten.visualize.visualize" in modules
+        assert "litten.visualize.visualize" not in _loaded_modules("import litten.visualize.palettes")
+
+    def test_summary_import_is_light(self):
+        modules = _loaded_modules("from litten import LayersSummary")
+        assert "tensorflow" not in modules
+
+    def test_lazy_attribute(self):
+        modules = _loaded_modules("from litten import ModelVisualizer")
+        assert "tensorflow" not in modules
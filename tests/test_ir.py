@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from litten.ir import LayerRecord, ModelIR, to_records
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _model():
+    x = fake_layer("Input", shape=(None, 32, 32, 3))
+    layers = [x,
+              fake_layer("Conv2D", filters=16, kernel_size=(3, 3), input_shape=(None, 32, 32, 3), output_shape=(None, 30, 30, 16), activation=None),
+              fake_layer("Dropout", rate=0.5),
+              fake_layer("Dense", units=10, input_shape=(None, 16), output_shape=(None, 10))]
+    return fake_model(layers, name="net")
+
+
+class TestModelIR:
+
+    def test_extract(self):
+        records = to_records(_model().layers)
+
+        assert [record.class_name for record in records] == ["Input", "Conv2D", "Dropout", "Dense"]
+        assert records[0].input_shape == (None, 32, 32, 3)
+        assert records[1].filters == 16 and records[1].kernel_size == (3, 3)
+        assert records[3].units == 10
+        assert to_records(records) is not records and to_records(records) == records
+
+        with pytest.raises(AttributeError):
+            records[2].units
+
+    def test_slots(self):
+        record = LayerRecord("Dropout", config={"rate": 0.1})
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+    def test_json_round_trip(self, tmp_path):
+        model = ModelIR.extract(_model())
+        path  = str(tmp_path / "net.litten.json")
+        model.save(path)
+        loaded = ModelIR.load(path)
+
+        assert loaded.name == "net"
+        assert [record.to_dict() for record in loaded.layers] == [record.to_dict() for record in model.layers]
+        assert loaded.layers[1].kernel_size == (3, 3)
+
+    def test_msgpack_round_trip(self):
+        pytest.importorskip("msgpack")
+        model = ModelIR.extract(_model())
+        assert ModelIR.from_msgpack(model.to_msgpack()).to_dict() == model.to_dict()
+
+    def test_render_matches_live_model(self):
+        live = ModelVisualizer(_model()).visualize_model(scale=0.05, output="bytes", show_names=True)
+        ir   = ModelVisualizer(ModelIR.extract(_model())).visualize_model(scale=0.05, output="bytes", show_names=True)
+        assert live == ir
+
+    def test_render_without_tensorflow(self, tmp_path):
+        path = str(tmp_path / "net.litten.json")
+        ModelIR.extract(_model()).save(path)
+
+        code = ("import sys\n"
+                "from litten.ir import ModelIR\n"
+                "from litten import ModelVisualizer\n"
+                "ModelVisualizer(ModelIR.load({!r})).visualize_model(scale=0.05, output='image')\n"
+                "assert 'tensorflow' not in sys.modules and 'keras' not in sys.modules\n").format(path)
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
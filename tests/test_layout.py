@@ -0,0 +1,30 @@
+from litten.layers import ConvLayer, DropoutLayer
+from litten.visualize import layout
+from litten.visualize.palettes import Default
+
+from conftest import fake_layer
+
+
+class TestLayout:
+
+    def test_layout_does_not_mutate_layers(self):
+        layers = [fake_layer("Input", shape=(None, 8)), fake_layer("Dropout", rate=0.5), fake_layer("Dropout", rate=0.2)]
+        placed = layout.layout_layers(layers, palette=Default)
+
+        assert len(layers) == 3
+        assert [layer.__class__.__name__ for layer in placed] == ["InputLayer", "DropoutLayer", "DropoutLayer"]
+        assert placed[1]._start_x == placed[0].end
+        assert placed[2]._start_x == placed[1].end
+
+    def test_conv_extent_grows_with_filters(self):
+        small = ConvLayer("Conv2D", 2,   (3, 3), "relu", (None, 32, 32, 3),   (None, 30, 30, 2),   start_x=0, palette=Default)
+        large = ConvLayer("Conv2D", 512, (3, 3), "relu", (None, 900, 900, 3), (None, 898, 898, 512), start_x=0, palette=Default)
+
+        assert large.layout() > small.layout()
+        assert layout.get_extent([large])[2] >= large.end
+
+    def test_extent_includes_labels(self):
+        layer = DropoutLayer("Dropout", rate=0.5, start_x=0, palette=Default)
+
+        assert layer.bounds()[3] == 2000
+        assert layer.bounds(show_properties=True)[3] > 2220
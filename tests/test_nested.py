@@ -0,0 +1,70 @@
+import io
+
+from litten.layers import ModelLayer
+from litten.summary.summary import LayersSummary
+from litten.visualize import layout
+from litten.visualize.palettes import Default
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+class _Untouched:
+    # a nested model whose layers must not be read
+    name = "backbone"
+
+    @property
+    def layers(self):
+        raise AssertionError("collapsed model layers were read")
+
+
+def _model(inner):
+    block = fake_model([fake_layer("InputLayer", shape=(None, 8)), fake_layer("Dropout", rate=0.1), inner], name="block")
+    return fake_model([fake_layer("Input", shape=(None, 8)), block, fake_layer("Dropout", rate=0.3)], class_name="Functional")
+
+
+class TestNestedModels:
+
+    def test_collapsed_by_default(self):
+        model  = _model(fake_layer("BatchNormalization"))
+        placed = layout.layout_layers(model.layers, palette=Default)
+
+        assert isinstance(placed[1], ModelLayer)
+        assert not placed[1].expanded
+        assert placed[2].start == placed[1].end
+
+    def test_expand_depth(self):
+        model  = _model(_model(fake_layer("BatchNormalization")))
+        placed = layout.layout_layers(model.layers, palette=Default, expand_depth=2)
+
+        outer = placed[1]
+        assert [layer.__class__.__name__ for layer in outer.layers] == ["DropoutLayer", "ModelLayer"]
+        assert outer.layers[1].expanded
+        assert outer.layers[1].layers[0].expanded is False
+        assert outer.layers[0].start > outer.start
+        assert placed[2].start == outer.end
+
+        box = outer.bounds()
+        for layer in outer.layers:
+            inner = layer.bounds()
+            assert box[0] <= inner[0] and inner[2] <= box[2] and box[1] <= inner[1]
+
+    def test_lazy_traversal(self):
+        model = _model(_Untouched())
+
+        layout.layout_layers(model.layers, palette=Default, expand_depth=1)
+        image = ModelVisualizer(model).visualize_model(scale=0.05, output="image", show_connectors=True, expand_depth=1)
+        assert image.width > 0
+
+    def test_summary(self):
+        model = _model(fake_layer("BatchNormalization"))
+
+        collapsed = io.StringIO()
+        LayersSummary().show_layers_summaries(model, file=collapsed)
+        assert "Layer 2: Sequential" in collapsed.getvalue()
+        assert "Layer 2.2" not in collapsed.getvalue()
+
+        expanded = io.StringIO()
+        LayersSummary().show_layers_summaries(model, file=expanded, depth=1)
+        assert "Layer 2.2: Dropout" in expanded.getvalue()
+        assert "Layer 3: Dropout" in expanded.getvalue()
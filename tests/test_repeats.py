@@ -0,0 +1,76 @@
+import time
+
+from litten.visualize import layout
+from litten.visualize.palettes import Default
+from litten.visualize.repeats import find_repeats
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+def _blocks(count):
+    layers = []
+    for _ in range(count):
+        layers += [fake_layer("BatchNormalization"), fake_layer("Dropout", rate=0.5), fake_layer("ReLU")]
+    return layers
+
+
+class TestRepeats:
+
+    def test_find_blocks(self):
+        layers = [fake_layer("Dropout", rate=0.1)] + _blocks(4) + [fake_layer("Dropout", rate=0.2)] * 3
+
+        assert find_repeats(layers) == [(1, 3, 4), (13, 1, 3)]
+        assert find_repeats(layers, min_length=2) == [(1, 3, 4)]
+
+    def test_config_matters(self):
+        layers = [fake_layer("Dropout", rate=0.1), fake_layer("Dropout", rate=0.2)]
+        assert find_repeats(layers) == []
+
+    def test_linear_scan(self):
+        layers = _blocks(1000)
+
+        start = time.perf_counter()
+        assert find_repeats(layers) == [(0, 3, 1000)]
+        assert time.perf_counter() - start < 2
+
+    def test_collapsed_layout(self):
+        layers = [fake_layer("Input", shape=(None, 8))] + _blocks(5)
+
+        placed = layout.layout_layers(layers, palette=Default, collapse_repeats=True)
+        assert len(placed) == 4
+        assert placed[-1].repeat == (placed[1], 5)
+        assert placed[-1].bounds()[1] < placed[1].bounds()[1]
+
+        assert len(layout.layout_layers(layers, palette=Default)) == 16
+
+    def test_shapes_matter(self):
+        from tensorflow.keras import layers, models
+
+        convs = [layers.Conv2D(8, 3, strides=2, padding="same") for _ in range(3)]
+        model = models.Sequential([layers.Input((64, 64, 3))] + convs)
+        assert find_repeats(model.layers) == []
+
+        same  = models.Sequential([layers.Input((64, 64, 3))] + [layers.Conv2D(3, 3, padding="same") for _ in range(3)])
+        assert find_repeats(same.layers) == [(0, 1, 3)]
+        placed = layout.layout_layers(model.layers, palette=Default, collapse_repeats=True)
+        assert len(placed) == 4 and all(layer.repeat is None for layer in placed)
+
+    def test_annotations_around_blocks(self):
+        layers  = [fake_layer("InputLayer", shape=(None, 8), name="input")]
+        layers += [fake_layer("Dense", units=8, activation="relu", name="dense_{}".format(i)) for i in range(3)]
+        layers += [fake_layer("Dropout", rate=0.5, name="drop"), fake_layer("Dense", units=2, activation="softmax", name="output")]
+        notes   = {layer.name: layer.name for layer in layers}
+
+        for collapse in (False, True):
+            visualizer = ModelVisualizer(fake_model(layers))
+            visualizer.visualize_model(scale=0.05, output="image", collapse_repeats=collapse, annotations=notes)
+            annotated = [layer.annotation for layer in visualizer._layout[2][0] if layer.annotation is not None]
+            assert annotated == (["input", "drop", "output"] if collapse else [layer.name for layer in layers])
+
+    def test_render(self):
+        model = fake_model([fake_layer("Input", shape=(None, 8))] + _blocks(5))
+
+        collapsed = ModelVisualizer(model).visualize_model(scale=0.05, output="image")
+        full      = ModelVisualizer(model).visualize_model(scale=0.05, output="image", collapse_repeats=False)
+        assert collapsed.width < full.width
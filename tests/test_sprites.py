@@ -0,0 +1,98 @@
+from PIL import Image, ImageChops
+
+from litten.layers import ConvLayer, DenseLayer, DropoutLayer
+from litten.layers.canvas import ScaledDraw
+from litten.layers import fonts
+from litten.layers.sprites import SpriteCache, TextCache
+from litten.visualize.palettes import Blues, Default
+
+
+def _layers():
+    return [DenseLayer("Dense", 10, "relu", (None, 64), (None, 10), start_x=0, palette=Default),
+            DropoutLayer("Dropout", 0.5, start_x=800, palette=Default),
+            DenseLayer("Dense", 20, "relu", (None, 10), (None, 20), start_x=1600, palette=Default),
+            DropoutLayer("Dropout", 0.2, start_x=2400, palette=Default)]
+
+
+class TestSpriteCache:
+
+    def test_sprites_match_direct_drawing(self):
+        direct = Image.new("RGB", (3200, 3200), color="#ffffff")
+        cached = Image.new("RGB", (3200, 3200), color="#ffffff")
+        cache  = SpriteCache()
+
+        for layer in _layers():
+            layer.draw(ScaledDraw(direct), show_name=True)
+            layer.draw(ScaledDraw(cached, sprites=cache), show_name=True)
+
+        assert ImageChops.difference(direct, cached).getbbox() is None
+        assert (cache.misses, cache.hits) == (2, 2)
+
+    def test_key_and_eviction(self):
+        cache = SpriteCache(maxsize=2)
+        image = Image.new("RGB", (2000, 3200))
+        draw  = ScaledDraw(image, scale=0.5, sprites=cache)
+
+        ConvLayer("Conv2D", 32, 3, "relu", (None, 28, 28, 1), (None, 26, 26, 32), start_x=0, palette=Default).draw(draw)
+        ConvLayer("Conv2D", 64, 3, "relu", (None, 28, 28, 1), (None, 26, 26, 64), start_x=0, palette=Default).draw(draw)
+        ConvLayer("Conv2D", 32, 3, "relu", (None, 28, 28, 1), (None, 26, 26, 32), start_x=0, palette=Blues).draw(draw)
+
+        assert cache.misses == 3
+        assert len(cache) == 2
+
+    def test_byte_bound(self):
+        cache  = SpriteCache(max_bytes=10 * 10 * 4 * 2)
+        render = lambda sprite: None
+
+        cache.get("a", (10, 10), render)
+        cache.get("b", (10, 10), render)
+        cache.get("c", (10, 10), render)
+        assert len(cache) == 2 and cache.bytes == 800
+
+        # too big to keep, still rendered
+        assert cache.get("big", (20, 20), render).size == (20, 20)
+        assert len(cache) == 2 and cache.get("c", (10, 10), render) is not None and cache.hits == 1
+
+        image = Image.new("P", (1, 1))
+        image.putpalette([255, 255, 255] * 256)
+        cache.get_indexed(("c",), (10, 10), render, image)
+        assert cache.bytes <= cache.max_bytes
+
+
+class TestTextCache:
+
+    def test_labels_match_direct_drawing(self):
+        # labels at whole pixels are drawn exactly like ImageDraw.text
+        direct = Image.new("RGB", (3200, 3200), color="#ffffff")
+        cached = Image.new("RGB", (3200, 3200), color="#ffffff")
+        cache  = TextCache()
+
+        for layer in _layers():
+            layer.draw(ScaledDraw(direct), show_name=True, show_properties=True)
+            layer.draw(ScaledDraw(cached, texts=cache), show_name=True, show_properties=True)
+
+        assert ImageChops.difference(direct, cached).getbbox() is None
+        assert cache.hits > 0 and len(cache) == cache.misses
+
+    def test_colors_share_a_mask(self):
+        cache = TextCache()
+        image = Image.new("RGB", (400, 100), color="#ffffff")
+        draw  = ScaledDraw(image, texts=cache)
+
+        draw.text((0, 0), "relu", fill="#000000", size=40)
+        draw.text((200, 0), "relu", fill="#ff0000", size=40)
+
+        assert (cache.misses, cache.hits) == (1, 1)
+        assert (255, 0, 0) in [color for _, color in image.crop((200, 0, 400, 100)).getcolors(400 * 100)]
+
+    def test_measure_and_eviction(self):
+        cache = TextCache(maxsize=2)
+        x0, y0, x1, y1 = cache.measure("Conv2D\n(None, 32)", 40)
+
+        mask, (dx, dy) = cache.get("Conv2D\n(None, 32)", 40)
+        assert (dx, dy, dx + mask.width, dy + mask.height) == (x0, y0, x1, y1)
+        assert y1 - y0 > fonts.get_font(40).getbbox("Conv2D")[3]
+
+        cache.get("relu", 40)
+        cache.get("tanh", 40)
+        assert len(cache) == 2 and cache.misses == 3
@@ -0,0 +1,34 @@
+import xml.etree.ElementTree as ElementTree
+
+from litten.layers import Connector, DenseLayer, DropoutLayer
+from litten.layers.svg import SVGDraw
+from litten.visualize.palettes import Default
+
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+class TestSVGDraw:
+
+    def test_layers_emit_svg_elements(self):
+        draw  = SVGDraw((1700, 3200), scale=0.1)
+        dense = DenseLayer("Dense", 10, "relu", (None, 64), (None, 10), start_x=0, palette=Default)
+        drop  = DropoutLayer("Dropout", 0.5, start_x=800, palette=Default)
+
+        dense.draw(draw, show_properties=True)
+        drop.draw(draw, show_name=True)
+        Connector().connect(draw, dense, drop)
+
+        root = ElementTree.fromstring(draw.tostring())
+        assert root.attrib["width"] == "170"
+        assert root.attrib["viewBox"] == "0 0 1700 3200"
+        assert len(root.findall(SVG + "ellipse")) == 6
+        assert len(root.findall(SVG + "text")) == 6
+        assert root.findall(SVG + "text")[3][1].text == "(None, 64)"
+
+    def test_text_is_escaped(self):
+        draw = SVGDraw((100, 100))
+        draw.text((0, 0), "<Conv & Pool>", fill="#000000")
+
+        root = ElementTree.fromstring(draw.tostring())
+        assert root.find(SVG + "text")[0].text == "<Conv & Pool>"
@@ -0,0 +1,87 @@
+from PIL import ImageChops
+
+from litten.visualize import layout
+from litten.visualize.palettes import Default
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+def _model(depth=12):
+    layers = [fake_layer("Input", shape=(None, 16), name="input")]
+    for i in range(depth):
+        layer = fake_layer("Dropout", rate=0.1 * (i + 1)) if i % 2 else fake_layer("Dense", units=8 + i, activation=None)
+        layer.name = "layer_{}".format(i + 1)
+        layers.append(layer)
+    return fake_model(layers)
+
+
+class TestViewport:
+
+    def test_viewport_matches_crop(self):
+        visualizer = ModelVisualizer(_model())
+        # a power of two scale keeps the viewport origin exact in diagram units
+        options    = dict(show_names=True, show_properties=True, scale=1 / 16)
+
+        full = visualizer.visualize_model(output="image", **options)
+        for box in [(0, 0, 60, full.height), (37, 5, 151, full.height - 3), (full.width - 50, 0, full.width, full.height)]:
+            window = visualizer.visualize_model(output="image", viewport=box, **options)
+            assert window.size == (box[2] - box[0], box[3] - box[1])
+            assert ImageChops.difference(window, full.crop(box)).getbbox() is None
+
+    def test_viewport_connectors(self):
+        visualizer = ModelVisualizer(_model())
+        options    = dict(show_connectors=True, scale=1 / 16)
+
+        full = visualizer.visualize_model(output="image", **options)
+        box  = (37, 0, 151, full.height)
+        diff = ImageChops.difference(visualizer.visualize_model(output="image", viewport=box, **options), full.crop(box))
+
+        # lines entering from outside the window may rasterize a pixel apart
+        gray = diff.convert("L")
+        assert gray.width * gray.height - gray.histogram()[0] < 10
+
+    def test_layer_range(self):
+        visualizer = ModelVisualizer(_model())
+        options    = dict(show_connectors=True, show_names=True, scale=0.05)
+
+        full   = visualizer.visualize_model(output="image", **options)
+        window = visualizer.visualize_model(output="image", layer_range=(3, 5), **options)
+        named  = visualizer.visualize_model(output="image", layer_range=("layer_3", "layer_5"), **options)
+
+        assert window.width < full.width / 2
+        assert ImageChops.difference(window, named).getbbox() is None
+        assert visualizer.visualize_model(output="image", layer_range=(-2, -1), **options).size[0] < full.width / 2
+
+    def test_unknown_layer_name(self):
+        try:
+            ModelVisualizer(_model()).visualize_model(output="image", layer_range=("input", "missing"))
+        except ValueError:
+            return
+        assert False
+
+
+class TestLayerIndex:
+
+    def test_overlapping(self):
+        placed = layout.layout_layers(_model().layers, palette=Default)
+        index  = layout.LayerIndex(placed)
+
+        assert index.overlapping(-10 ** 6, 10 ** 6) == list(range(len(placed)))
+        x = (index.bounds[4][0] + index.bounds[4][2]) / 2
+        assert index.overlapping(x, x) == [4]
+        assert index.overlapping(x, x, neighbours=True) == [4, 5]
+
+    def test_between_collapsed_block(self):
+        layers = [fake_layer("Input", shape=(None, 8))]
+        for _ in range(4):
+            layers += [fake_layer("BatchNormalization"), fake_layer("ReLU")]
+        layers.append(fake_layer("Dense", units=4, activation=None))
+
+        placed = layout.layout_layers(layers, palette=Default, collapse_repeats=True)
+        index  = layout.LayerIndex(placed)
+
+        # any layer of the repeated block selects the whole glyph
+        assert index.between(3, 3) == [1, 2]
+        assert index.between(9, 9) == [3]
+        assert index.between(0, 9) == [0, 1, 2, 3]
@@ -0,0 +1,211 @@
+import io
+import os
+
+from PIL import Image, ImageChops
+
+from litten.visualize.cache import RenderCache
+from litten.visualize.visualize import ModelVisualizer
+
+from conftest import fake_layer, fake_model
+
+
+def _model(depth=6):
+    layers = [fake_layer("Input", shape=(None, 16))]
+    for i in range(depth):
+        layers.append(fake_layer("Dropout", rate=0.5) if i % 2 else fake_layer("BatchNormalization"))
+    return fake_model(layers)
+
+
+class TestModelVisualizer:
+
+    def test_strips_match_full_render(self):
+        visualizer = ModelVisualizer(_model())
+        options    = dict(show_connectors=True, show_names=True, scale=0.05)
+
+        [(_, full)] = list(visualizer.render_strips(strip_width=10 ** 6, **options))
+        strips      = list(visualizer.render_strips(strip_width=64, **options))
+
+        stitched = Image.new("RGB", full.size)
+        for left, image in strips:
+            assert image.width <= 64
+            stitched.paste(image, (left, 0))
+
+        assert len(strips) == -(-full.width // 64)
+        assert ImageChops.difference(stitched, full).getbbox() is None
+
+    def test_save_strips(self, tmp_path):
+        paths = ModelVisualizer(_model()).save_strips(str(tmp_path), strip_width=100, scale=0.05)
+
+        assert len(paths) > 1
+        assert all(Image.open(path).height == Image.open(paths[0]).height for path in paths)
+
+    def test_headless_output(self, tmp_path):
+        visualizer = ModelVisualizer(_model())
+
+        image = visualizer.visualize_model(scale=0.05, output="image")
+        assert isinstance(image, Image.Image)
+
+        data = visualizer.visualize_model(scale=0.05, output="bytes", compress_level=1)
+        assert data[:8] == b"\x89PNG\r\n\x1a\n"
+
+        path = str(tmp_path / "model.webp")
+        visualizer.visualize_model(scale=0.05, output=path, quality=50, method=0)
+        assert Image.open(path).format == "WEBP"
+
+        path = str(tmp_path / "model.png")
+        visualizer.visualize_model(scale=0.05, output=path, colors=8)
+        assert Image.open(path).mode == "P"
+
+        document = visualizer.visualize_model(backend="svg", output="image")
+        assert document.startswith("<svg")
+
+    def test_format_aliases(self, tmp_path):
+        visualizer = ModelVisualizer(_model())
+
+        for cache in (None, str(tmp_path / "cache")):
+            for format in ("jpg", "JPEG", ".jpeg"):
+                data = visualizer.visualize_model(scale=0.05, output="bytes", format=format, cache=cache)
+                assert Image.open(io.BytesIO(data)).format == "JPEG"
+        assert Image.open(io.BytesIO(visualizer.visualize_model(scale=0.05, output="bytes", format="tif"))).format == "TIFF"
+
+    def test_unknown_options(self):
+        visualizer = ModelVisualizer(_model())
+
+        for options in (dict(show_name=True), dict(pallete="red", output="image"), dict(compress_level=1, qualty=80)):
+            try:
+                visualizer.visualize_model(scale=0.05, **options)
+            except TypeError:
+                continue
+            assert False
+
+    def test_render_cache(self, tmp_path):
+        cache = RenderCache(str(tmp_path / "cache"))
+
+        first  = ModelVisualizer(_model()).visualize_model(scale=0.05, output="bytes", cache=cache)
+        second = ModelVisualizer(_model()).visualize_model(scale=0.05, output="bytes", cache=cache)
+        other  = ModelVisualizer(_model()).visualize_model(scale=0.05, output="bytes", cache=cache, show_names=True)
+
+        assert first == second
+        assert first != other
+        assert len(os.listdir(cache.directory)) == 2
+
+        image = ModelVisualizer(_model()).visualize_model(scale=0.05, output="image", cache=cache)
+        assert image.size == Image.open(io.BytesIO(first)).size
+
+    def test_render_cache_names(self, tmp_path):
+        from litten.layers import fonts
+
+        cache  = RenderCache(str(tmp_path / "cache"))
+        models = [_model(), _model()]
+        for model, names in zip(models, (["a", "b", "c"], ["c", "b", "a"])):
+            for layer, name in zip(model.layers, names):
+                layer.name = name
+
+        # the same names point at other layers of the second model
+        for options in (dict(layer_range=("a", "b")), dict(annotations={"a": "first"})):
+            first  = ModelVisualizer(models[0]).visualize_model(scale=0.05, output="bytes", cache=cache, **options)
+            second = ModelVisualizer(models[1]).visualize_model(scale=0.05, output="bytes", cache=cache, **options)
+            assert first != second
+            assert second == ModelVisualizer(models[1]).visualize_model(scale=0.05, output="bytes", **options)
+
+        entries = len(os.listdir(cache.directory))
+        path    = fonts.get_font_path()
+        try:
+            fonts.set_font("missing.ttf")
+            ModelVisualizer(models[0]).visualize_model(scale=0.05, output="bytes", cache=cache, layer_range=("a", "b"))
+        finally:
+            fonts.set_font(path)
+        assert len(os.listdir(cache.directory)) == entries + 1
+
+    def test_render_cache_eviction(self, tmp_path):
+        cache = RenderCache(str(tmp_path), max_bytes=10)
+        cache.put("a", b"12345678")
+        cache.put("b", b"12345678")
+
+        assert cache.get("a") is None
+        assert cache.get("b") == b"12345678"
+
+
+class TestIncrementalRender:
+
+    def _render(self, visualizer):
+        return visualizer.visualize_model(show_connectors=True, show_names=True, show_properties=True, scale=0.05, output="image")
+
+    def test_appended_layers(self):
+        model      = _model(depth=2)
+        visualizer = ModelVisualizer(model)
+        first      = self._render(visualizer)
+        records    = visualizer._layers()
+        ops        = list(visualizer._display[1].ops)
+
+        for layer in [fake_layer("Dense", units=8, activation="relu"), fake_layer("Dropout", rate=0.1), fake_layer("Dense", units=2, activation=None)]:
+            model.layers.append(layer)
+            image = self._render(visualizer)
+            assert ImageChops.difference(image, self._render(ModelVisualizer(model))).getbbox() is None
+
+        # the leading layers were neither read nor recorded again
+        assert visualizer._layers()[0] is records[0]
+        assert visualizer._display[1].ops[0] is ops[0]
+        assert image.width > first.width
+
+    def test_changed_layers(self):
+        model      = _model(depth=6)
+        visualizer = ModelVisualizer(model)
+        self._render(visualizer)
+
+        model.layers[3] = fake_layer("Dense", units=4, activation=None)
+        image = self._render(visualizer)
+        assert ImageChops.difference(image, self._render(ModelVisualizer(model))).getbbox() is None
+
+        del model.layers[4:]
+        image = self._render(visualizer)
+        assert ImageChops.difference(image, self._render(ModelVisualizer(model))).getbbox() is None
+
+    def test_extended_repeat(self):
+        model      = _model(depth=4)
+        visualizer = ModelVisualizer(model)
+        self._render(visualizer)
+
+        # the appended pair grows the repeated block drawn before it
+        model.layers += [fake_layer("BatchNormalization"), fake_layer("Dropout", rate=0.5)]
+        image = self._render(visualizer)
+        assert ImageChops.difference(image, self._render(ModelVisualizer(model))).getbbox() is None
+
+    def test_returned_image_is_a_copy(self):
+        model      = _model(depth=2)
+        visualizer = ModelVisualizer(model)
+        image      = self._render(visualizer)
+        image.paste((255, 0, 0), (0, 0, image.width, image.height))
+
+        model.layers.append(fake_layer("Dropout", rate=0.1))
+        assert ImageChops.difference(self._render(visualizer), self._render(ModelVisualizer(model))).getbbox() is None
+
+
+class TestIndexedCanvas:
+
+    def test_matches_rgb_render(self):
+        visualizer = ModelVisualizer(_model())
+        # no label, the repeat badge is one
+        options    = dict(show_connectors=True, scale=0.05, collapse_repeats=False)
+
+        rgb     = visualizer.visualize_model(output="image", **options)
+        indexed = visualizer.visualize_model(output="image", image_mode="P", **options)
+
+        assert indexed.mode == "P"
+        assert ImageChops.difference(rgb, indexed.convert("RGB")).getbbox() is None
+
+    def test_labels_use_palette_colors(self):
+        visualizer = ModelVisualizer(_model())
+        image      = visualizer.visualize_model(output="image", image_mode="P", show_names=True, show_properties=True, scale=0.05)
+
+        # aliased labels add no blended color
+        assert len(image.getcolors()) <= len(image.getpalette()) // 3 <= 8
+        assert len(visualizer.visualize_model(output="bytes", image_mode="P", scale=0.05)) < len(visualizer.visualize_model(output="bytes", scale=0.05))
+
+    def test_encoders(self, tmp_path):
+        visualizer = ModelVisualizer(_model())
+
+        visualizer.visualize_model(scale=0.05, output=str(tmp_path / "model.jpg"), image_mode="P")
+        assert Image.open(tmp_path / "model.jpg").mode == "RGB"
+        [(_, strip)] = list(visualizer.render_strips(scale=0.05, image_mode="P"))
+        assert strip.mode == "P"